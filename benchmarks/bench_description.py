@@ -0,0 +1,222 @@
+"""
+Compares the description converter with the per-site re.sub chains it
+replaced.
+
+The legacy chains are kept here verbatim as the reference. For every site
+the fixture description, plus a batch of randomly generated tag soups, must
+convert to exactly the same text before descriptions per second are
+reported for both:
+
+    python -m benchmarks.bench_description --repeat 2000
+"""
+import argparse
+import os
+import random
+import re
+import time
+
+from utils.description import PROFILES, html_to_telegram
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures',
+                            'descriptions')
+
+
+def legacy_linkedin(text):
+    text = re.sub(r'[\"\']', "'", text)
+    div_wrapper_pattern = (
+        r"<div class='show-more-less-html__markup "
+        r"show-more-less-html__markup--clamp-after-5\s+relative "
+        r"overflow-hidden'>|<div class='show-more-less-html__markup "
+        r"relative overflow-hidden'>"
+    )
+    text = re.sub(div_wrapper_pattern, "", text, flags=re.IGNORECASE)
+    text = re.sub(r'[\n\t]+', ' ', text)
+    text = re.sub(r'\s{2,}', ' ', text)
+    text = re.sub(r"<p><br></p>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"</p>|<br\s*/?>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"</ul>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"</li>", "\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<div>|</div>|<ul>|</ol>|<span>|</span>", "", text,
+                  flags=re.IGNORECASE)
+    text = re.sub(r"<p>|<ol>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<li>", "\n • ", text, flags=re.IGNORECASE)
+    text = re.sub(r"•\s*\n", "• ", text)
+    text = re.sub(r"\s+•", " •", text)
+    text = re.sub(r"(\n\s*){3,}", "\n\n", text)
+    text = re.sub(r"\n\n</strong>\n", "\n</strong>\n", text,
+                  flags=re.IGNORECASE)
+    for keyword_text in ["Job ID", "Job Type", "Location", "Categories",
+                         "Applications close"]:
+        escaped_keyword = re.escape(keyword_text)
+        cur_pattern_str = r"(?<=\b" + escaped_keyword + r"\b)\n\n"
+        text = re.sub(cur_pattern_str, "\n", text)
+    return text.strip()
+
+
+def legacy_jobstreet(text):
+    text = re.sub(r'\n|\t', '', text)
+    text = re.sub(r'\"', "'", text)
+    text = " ".join(text.split()).strip()
+    text = re.sub(r"<p><br\s*/?></p>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"</ul\s*>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<h4[^>]*>", "<strong>", text, flags=re.IGNORECASE)
+    text = re.sub(r"</h4>", "</strong>", text, flags=re.IGNORECASE)
+    tags_to_remove_pattern = (
+        r"<div[^>]*>|<div>|</div>|<ul[^>]*>|<ul>|</li>|</p>|"
+        r"</ol>|<br\s*/?>|<span[^>]*>|<span>|</span>"
+    )
+    text = re.sub(tags_to_remove_pattern, "", text, flags=re.IGNORECASE)
+    text = re.sub(r"<p>|<ol>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<li[^>]*>", "\n • ", text, flags=re.IGNORECASE)
+    text = re.sub(r"•\s*\n", "• ", text)
+    text = re.sub(r"\s+•", " •", text)
+    text = re.sub(r"(\n\s*){2,}", "\n\n", text)
+    text = re.sub(r"\n\n</strong>\n", "\n</strong>\n", text,
+                  flags=re.IGNORECASE)
+    return text.strip()
+
+
+def _legacy_r_tidy(text):
+    text = re.sub(r"\n\s+\n", "\n\n", text)
+    text = re.sub(r"\n\n<strong>\n\n", "<strong>\n\n", text,
+                  flags=re.IGNORECASE)
+    text = re.sub(r"•\s*\n(\s*\n)?", "• ", text)
+    text = re.sub(r"\s+•", " •", text)
+    text = re.sub(r"(\n\s*){2,}", "\n\n", text)
+    text = re.sub(r"\n\n</strong>\n", "\n</strong>\n", text,
+                  flags=re.IGNORECASE)
+    return text.strip()
+
+
+def _legacy_r_head(text, closing_ul):
+    text = re.sub(r'\n|\t', '', text)
+    text = re.sub(r'\"', "'", text)
+    text = " ".join(text.split()).strip()
+    text = re.sub(r"<p><br\s*/?></p>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(closing_ul, "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<h[1-9][^>]*>", "<strong>", text, flags=re.IGNORECASE)
+    text = re.sub(r"</h[1-9]>", "</strong>", text, flags=re.IGNORECASE)
+    return text
+
+
+def legacy_petromindo(text):
+    text = _legacy_r_head(text, r"</ul\s*>")
+    tags_to_remove_pattern = (
+        r"<div[^>]*>|<div>|</div>|<ul[^>]*>|<ul>|</li>|</p>|"
+        r"</ol>|<br\s*/?>|<span[^>]*>|<span>|</span>"
+    )
+    text = re.sub(tags_to_remove_pattern, "", text, flags=re.IGNORECASE)
+    text = re.sub(r"<p[^>]*>|<ol>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<li[^>]*>", "\n • ", text, flags=re.IGNORECASE)
+    return _legacy_r_tidy(text)
+
+
+def legacy_disnakerja(text):
+    text = _legacy_r_head(text, r"</ul\s*>")
+    tags_to_remove_pattern_disnakerja = (
+        r"<div[^>]*>|<div>|</div>|<ul[^>]*>|<ul>|</li>|</p>|"
+        r"</ol>|<br\s*/?>|<span[^>]*>|<span>|</span>|"
+        r"<script[^>]*>.*?</script>|<ins[^>]*>.*?</ins>|<hr[^>]*>|"
+        r"<img[^>]*>|<noscript>.*?</noscript>|"
+        r"<iframe[^>]*>.*?</iframe>|<table[^>]*>.*?</table>|"
+        r"<tbody[^>]*>.*?</tbody>"
+    )
+    text = re.sub(tags_to_remove_pattern_disnakerja, "", text,
+                  flags=re.IGNORECASE | re.DOTALL)
+    text = text.replace(
+        "(adsbygoogle = window.adsbygoogle || []).push({});", "")
+    text = re.sub(r"</tr>|</td>", "\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<tr>|<td[^>]*>", "\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<p[^>]*>|<ol>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<li[^>]*>", "\n • ", text, flags=re.IGNORECASE)
+    return _legacy_r_tidy(text)
+
+
+def legacy_indeed(text):
+    text = _legacy_r_head(text, r"</ul>")
+    tags_to_remove_pattern = (
+        r"<div[^>]*>|<div>|</div>|<ul[^>]*>|<ul>|"
+        r"</li>|</p>|</ol>|<br\s*/?>|<span[^>]*>|<span>|</span>"
+    )
+    text = re.sub(tags_to_remove_pattern, "", text, flags=re.IGNORECASE)
+    text = re.sub(r"<p>|<ol>", "\n\n", text, flags=re.IGNORECASE)
+    text = re.sub(r"<li[^>]*>", "\n • ", text, flags=re.IGNORECASE)
+    return _legacy_r_tidy(text)
+
+
+LEGACY = {
+    'linkedin': legacy_linkedin,
+    'jobstreet': legacy_jobstreet,
+    'petromindo': legacy_petromindo,
+    'disnakerja': legacy_disnakerja,
+    'indeed': legacy_indeed,
+}
+
+# Building blocks for the random tag soups.
+SOUP_TOKENS = [
+    "<p>", "</p>", "<P>", "<p class='x'>", "<p><br></p>", "<p><br/></p>",
+    "<br>", "<br/>", "<BR />", "<div>", "<div class='a'>", "</div>",
+    "<ul>", "<ul class='b'>", "</ul>", "</ul >", "<ol>", "</ol>",
+    "<ol start='2'>", "<li>", "<li class='c'>", "</li>", "<span>",
+    "<span class='d'>", "</span>", "<h2>", "<h4 id='e'>", "</h2>", "</h4>",
+    "<strong>", "</strong>", "<b>", "</b>", "<tr>", "</tr>", "<td>",
+    "<td class='f'>", "</td>", "<table><tr><td>x</td></tr></table>",
+    "<script>var a = 1;</script>", "<ins class='g'></ins>", "<hr/>",
+    "<img src='h.png'/>", "<noscript>i</noscript>", "<link rel='j'>",
+    "(adsbygoogle = window.adsbygoogle || []).push({});", "•", " • ",
+    " ", "  ", "\n", "\n\n", "\t", "\xa0", "\r", "'", '"', "Job ID",
+    "Location", "Job Type", "Categories", "Applications close",
+    "Geologist", "Balikpapan", "S1 Teknik Geologi", "&amp;",
+]
+
+
+def random_soups(count, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(SOUP_TOKENS)
+                    for _ in range(rng.randint(1, 60)))
+            for _ in range(count)]
+
+
+def load_fixture(profile):
+    with open(os.path.join(FIXTURES_DIR, f"{profile}.html"),
+              encoding='utf-8') as f:
+        return f.read()
+
+
+def check_golden(profile, documents):
+    for document in documents:
+        expected = LEGACY[profile](document)
+        actual = html_to_telegram(document, profile)
+        if expected != actual:
+            raise SystemExit(f"{profile}: converter output differs for "
+                             f"{document!r}:\n{expected!r}\n{actual!r}")
+
+
+def measure(convert, document, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        convert(document)
+    return repeat / (time.perf_counter() - start)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--repeat', type=int, default=2000)
+    arg_parser.add_argument('--soups', type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    soups = random_soups(args.soups)
+    for profile in PROFILES:
+        document = load_fixture(profile)
+        check_golden(profile, [document] + soups)
+
+        legacy_rate = measure(LEGACY[profile], document, args.repeat)
+        rate = measure(lambda text: html_to_telegram(text, profile),
+                       document, args.repeat)
+        print(f"{profile:>10}: legacy {legacy_rate:8.0f} descriptions/s, "
+              f"converter {rate:8.0f} descriptions/s "
+              f"({rate / legacy_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
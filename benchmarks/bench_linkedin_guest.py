@@ -0,0 +1,62 @@
+"""
+Runs the HTTP guest paths against the local stand-in server.
+
+Lists a search and checks that every served card came back once and in
+order. Then fetches and extracts the details of every listed job on the
+enrichment thread pool. Reports the time taken by each step, including
+request pacing by utils.rate_limiter:
+
+    python -m benchmarks.bench_linkedin_guest --cards 100
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from benchmarks.linkedin_guest_server import FIRST_JOB_ID, start_server
+from utils import linkedin
+from utils.http_session import HOST_CONCURRENCY
+
+SEARCH_URL = ("https://www.linkedin.com/jobs/search?keywords=geologist"
+              "&location=Indonesia&geoId=102478259&position=1&pageNum=0")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--cards', type=int, default=100)
+    args = arg_parser.parse_args()
+
+    server, base_url = start_server(n_cards=args.cards)
+    linkedin.LINKEDIN_GUEST_BASE = base_url
+    max_pages = -(-args.cards // linkedin.GUEST_PAGE_SIZE) + 1
+
+    start = time.perf_counter()
+    # An empty seen_ids set pages through every result, where None would
+    # stop after the first page.
+    jobs_df = linkedin.get_job_from_linkedin_guest(
+        SEARCH_URL, seen_ids=set(), max_pages=max_pages)
+    elapsed = time.perf_counter() - start
+
+    expected = [str(FIRST_JOB_ID + i) for i in range(args.cards)]
+    if jobs_df['job_id'].tolist() != expected:
+        raise SystemExit("Guest listing did not return the served cards.")
+    print(f"{len(jobs_df)} cards in {elapsed:.2f}s "
+          f"({len(jobs_df) / elapsed:.1f} cards/s)")
+
+    def fetch_details(job_id):
+        page = linkedin._fetch_linkedin_job_posting(job_id)
+        return linkedin.extract_linkedin_details(page)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=HOST_CONCURRENCY) as executor:
+        details = list(executor.map(fetch_details, jobs_df['job_id']))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    if not all(d['job_description'] and d['industries'] for d in details):
+        raise SystemExit("Job details were not extracted.")
+    print(f"{len(details)} job details in {elapsed:.2f}s "
+          f"({len(details) / elapsed:.1f} jobs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the LinkedIn search results parser backends.
+
+Builds a deep-scrolled results page from the fixture by repeating its job
+cards, then reports cards per second and peak traced memory for each
+backend:
+
+    python -m benchmarks.bench_linkedin_parser --cards 1000
+"""
+import argparse
+import os
+import re
+import time
+import tracemalloc
+
+from utils.linkedin import parse_linkedin_results
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+CARD_PATTERN = re.compile(r"<li>\s*<div class=\"base-card.*?</li>", re.DOTALL)
+URN_PATTERN = re.compile(r"jobPosting:(\d+)")
+
+
+def build_page(n_cards):
+    """Returns a results page with n_cards distinct job cards."""
+    with open(os.path.join(FIXTURES_DIR, 'linkedin_search.html'),
+              encoding='utf-8') as f:
+        page = f.read()
+
+    cards = CARD_PATTERN.findall(page)
+    start = page.index(cards[0])
+    end = page.index(cards[-1]) + len(cards[-1])
+
+    generated = []
+    for i in range(n_cards):
+        card = cards[i % len(cards)]
+        generated.append(URN_PATTERN.sub(f"jobPosting:{4000000000 + i}",
+                                         card))
+    return page[:start] + "\n".join(generated) + page[end:]
+
+
+def measure(page, parser, repeat):
+    """Returns (cards per second, peak traced MiB, parsed DataFrame)."""
+    jobs_df = None
+    elapsed = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        jobs_df = parse_linkedin_results(page, parser=parser)
+        elapsed += time.perf_counter() - start
+
+    tracemalloc.start()
+    parse_linkedin_results(page, parser=parser)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return len(jobs_df) * repeat / elapsed, peak / 2 ** 20, jobs_df
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--cards', type=int, default=1000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    page = build_page(args.cards)
+    print(f"Page size: {len(page) / 2 ** 20:.1f} MiB, {args.cards} cards")
+
+    results = {}
+    for parser in ('html5lib', 'lxml'):
+        cards_per_sec, peak_mib, jobs_df = measure(page, parser, args.repeat)
+        results[parser] = jobs_df
+        print(f"{parser:>8}: {cards_per_sec:8.0f} cards/s, "
+              f"peak {peak_mib:7.1f} MiB")
+
+    if not results['html5lib'].equals(results['lxml']):
+        raise SystemExit("Parser backends returned different jobs.")
+
+
+if __name__ == "__main__":
+    main()
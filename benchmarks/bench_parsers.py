@@ -0,0 +1,204 @@
+"""
+Measures the listing parsers and the job page extractors of every source.
+
+Each case parses a checked-in fixture page the way the scrapers do and
+reports items per second (cards for listings, descriptions for job pages)
+and the peak memory traced while handling one page. Results can be written
+as JSON and compared with a run from another commit:
+
+    python -m benchmarks.bench_parsers --json before.json
+    python -m benchmarks.bench_parsers --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from utils.disnakerja import (_select_disnakerja_cards,
+                              extract_disnakerja_details, parse_disnakerja)
+from utils.indeed import extract_indeed_details, parse_job_card_indeed
+from utils.jobstreet import (details_from_page_soup, details_from_seek_job,
+                             find_seek_job, parse_jobstreet)
+from utils.linkedin import extract_linkedin_details, parse_linkedin_results
+from utils.petromindo import extract_petromindo_details, parse_petromindo
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+# Listing cases parse a results page into job records, selecting the cards
+# like the matching _get_*_page function. Each returns the parsed records.
+def linkedin_listing(page):
+    return parse_linkedin_results(page).to_dict('records')
+
+
+def jobstreet_listing(page):
+    soup = BeautifulSoup(page, 'html.parser')
+    return [parse_jobstreet(card) for card in
+            soup.find_all('article', attrs={"data-automation": "normalJob"})]
+
+
+def disnakerja_listing(page):
+    soup = BeautifulSoup(page, 'html.parser')
+    return [parse_disnakerja(card, industries='mining')
+            for card in _select_disnakerja_cards(soup)]
+
+
+def petromindo_listing(page):
+    soup = BeautifulSoup(page, 'html.parser')
+    return [parse_petromindo(card, industries='oil-gas')
+            for card in soup.select("article")]
+
+
+def indeed_listing(page):
+    soup = BeautifulSoup(page, 'html.parser')
+    return [parse_job_card_indeed(card) for card in soup.select("div.result")]
+
+
+# Job page cases run the extraction part of the matching enrich_* function
+# and return its details dict.
+def jobstreet_job(page):
+    return details_from_seek_job(find_seek_job(page))
+
+
+def jobstreet_job_dom(page):
+    return details_from_page_soup(BeautifulSoup(page, 'html.parser'))
+
+
+def disnakerja_job(page):
+    return extract_disnakerja_details(BeautifulSoup(page, 'html.parser'))
+
+
+def petromindo_job(page):
+    return extract_petromindo_details(BeautifulSoup(page, 'html.parser'))
+
+
+def indeed_job(page):
+    return extract_indeed_details(BeautifulSoup(page, 'html.parser'))
+
+
+# name: (fixture, function, unit, number of items the page must yield)
+CASES = {
+    'listing/linkedin': ('linkedin_search.html', linkedin_listing,
+                         'cards', 5),
+    'listing/jobstreet': ('jobstreet_search.html', jobstreet_listing,
+                          'cards', 30),
+    'listing/disnakerja': ('disnakerja_listing.html', disnakerja_listing,
+                           'cards', 24),
+    'listing/petromindo': ('petromindo_listing.html', petromindo_listing,
+                           'cards', 24),
+    'listing/indeed': ('indeed_search.html', indeed_listing, 'cards', 15),
+    'job/linkedin': ('linkedin_job_posting.html', extract_linkedin_details,
+                     'descriptions', 1),
+    'job/jobstreet': ('jobstreet_job.html', jobstreet_job,
+                      'descriptions', 1),
+    'job/jobstreet-dom': ('jobstreet_job.html', jobstreet_job_dom,
+                          'descriptions', 1),
+    'job/disnakerja': ('disnakerja_job.html', disnakerja_job,
+                       'descriptions', 1),
+    'job/petromindo': ('petromindo_job.html', petromindo_job,
+                       'descriptions', 1),
+    'job/indeed': ('indeed_job.html', indeed_job, 'descriptions', 1),
+}
+
+
+def count_items(name, result):
+    """Checks a case's output and returns how many items it parsed."""
+    if name.startswith('listing/'):
+        if not all(record.get('job_id') for record in result):
+            raise SystemExit(f"{name}: a card was parsed without a job_id.")
+        return len(result)
+    if not result.get('job_description'):
+        raise SystemExit(f"{name}: no job description was extracted.")
+    return 1
+
+
+def measure(name, repeat):
+    """Returns the result dict of one case."""
+    fixture, parse, unit, expected = CASES[name]
+    page = load_fixture(fixture)
+
+    items = count_items(name, parse(page))
+    if items != expected:
+        raise SystemExit(f"{name}: parsed {items} {unit}, "
+                         f"expected {expected}.")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(page)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    parse(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'unit': unit,
+        'items': items,
+        'page_kib': round(len(page.encode('utf-8')) / 1024, 1),
+        'rate': items * repeat / elapsed,
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    for name, result in results.items():
+        line = (f"{name:>20}: {result['rate']:9.0f} {result['unit']}/s, "
+                f"peak {result['peak_kib']:8.1f} KiB")
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += (f"  ({result['rate'] / previous['rate']:.2f}x rate, "
+                     f"{result['peak_kib'] - previous['peak_kib']:+.1f} KiB)")
+        print(line)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--repeat', type=int, default=50)
+    arg_parser.add_argument('--case', action='append', choices=CASES,
+                            help="Only run this case (can be repeated).")
+    arg_parser.add_argument('--json', help="Write the results to this file.")
+    arg_parser.add_argument('--compare',
+                            help="Compare with results written by --json.")
+    args = arg_parser.parse_args()
+
+    results = {name: measure(name, args.repeat)
+               for name in args.case or CASES}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'repeat': args.repeat,
+                'results': results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Local stand-in for LinkedIn's guest job endpoints.
+
+Serves numbered copies of the fixture job cards in pages of
+GUEST_PAGE_SIZE, the way seeMoreJobPostings/search does, and the fixture
+job posting fragment for any of them at jobPosting/<job_id>, so the HTTP
+listing and detail paths can be exercised without touching LinkedIn:
+
+    python -m benchmarks.linkedin_guest_server --port 8765 --cards 200
+    LINKEDIN_GUEST_BASE=http://127.0.0.1:8765/jobs-guest/jobs/api ...
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.bench_linkedin_parser import CARD_PATTERN, URN_PATTERN
+from benchmarks.bench_linkedin_parser import FIXTURES_DIR
+from utils.linkedin import GUEST_PAGE_SIZE
+
+API_PATH = '/jobs-guest/jobs/api'
+FIRST_JOB_ID = 4000000000
+
+
+def make_cards(n_cards):
+    """Returns n_cards distinct <li> job cards built from the fixture."""
+    with open(f"{FIXTURES_DIR}/linkedin_search.html", encoding='utf-8') as f:
+        cards = CARD_PATTERN.findall(f.read())
+    return [URN_PATTERN.sub(f"jobPosting:{FIRST_JOB_ID + i}",
+                            cards[i % len(cards)])
+            for i in range(n_cards)]
+
+
+def load_job_posting():
+    """Returns the fixture job posting fragment."""
+    with open(f"{FIXTURES_DIR}/linkedin_job_posting.html",
+              encoding='utf-8') as f:
+        return f.read()
+
+
+class GuestHandler(BaseHTTPRequestHandler):
+    cards = []
+    job_posting = ''
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.startswith(f"{API_PATH}/jobPosting/"):
+            job_id = int(url.path.rsplit('/', 1)[-1])
+            if not 0 <= job_id - FIRST_JOB_ID < len(self.cards):
+                self.send_error(404)
+                return
+            self._send_html(self.job_posting)
+            return
+        if url.path != f"{API_PATH}/seeMoreJobPostings/search":
+            self.send_error(404)
+            return
+
+        start = int(parse_qs(url.query).get('start', ['0'])[0])
+        if start >= len(self.cards):
+            self.send_error(400)
+            return
+        self._send_html("".join(self.cards[start:start + GUEST_PAGE_SIZE]))
+
+    def _send_html(self, body):
+        content = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, n_cards=200):
+    """
+    Starts the stand-in server on a background thread.
+
+    Returns:
+        tuple: (server, base URL to use as LINKEDIN_GUEST_BASE).
+    """
+    handler = type('Handler', (GuestHandler,), {
+        'cards': make_cards(n_cards), 'job_posting': load_job_posting()})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}{API_PATH}"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--cards', type=int, default=200)
+    args = arg_parser.parse_args()
+
+    server, base_url = start_server(args.port, args.cards)
+    print(f"Serving {args.cards} cards, LINKEDIN_GUEST_BASE={base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,13 @@ from oauth2client.service_account import ServiceAccountCredentials
 import gspread
 from dotenv import load_dotenv
 import os
-from gspread_dataframe import get_as_dataframe
 import asyncio
 
 from utils.indeed import enrich_indeed, get_job_from_indeed_keyword
+from utils.concurrency import merge_listings
 from utils.gsheet_utils import export_to_sheets
+from utils.seen_jobs import drop_cross_posted, sync_seen_jobs
+from utils.seen_keys import filter_unseen, mark_seen
 from utils.telegram_utlis import process_all_jobs
 
 load_dotenv(override=True)
@@ -161,32 +163,18 @@ if __name__ == "__main__":
         #     for url in urls
         #     ])
 
-        all_jobs_df = pd.concat([
+        all_jobs_df = merge_listings([
             get_job_from_indeed_keyword(
                 keyword=keyword, sb=sb)
             for keyword in keywords
-            ])
+            ], keywords)
 
         print(f"There are a total of {all_jobs_df.shape[0]} jobs..")
 
-        previously_scraped_df_sheet = spreadsheet\
-            .worksheet('Geosains Job')
-        previously_scraped_df = get_as_dataframe(previously_scraped_df_sheet)
-        # previously_scraped_df['job_id'] = pd.to_numeric(
-        #    previously_scraped_df['job_id'], errors='coerce')\
-        #    .astype('Int64')
-        # Then convert to string
-        previously_scraped_df = previously_scraped_df[
-            previously_scraped_df['source'] == "indeed"]
-        previously_scraped_df['job_id'] = previously_scraped_df['job_id']\
-            .astype(str)
-        # Replace '<NA>' if you had NaNs and don't want them as strings
-        previously_scraped_df['job_id'] = previously_scraped_df['job_id']\
-            .replace('<NA>', pd.NA)
-        # previously_scraped_df
-
-        all_jobs_df_filtered = all_jobs_df[
-            ~all_jobs_df.job_id.isin(previously_scraped_df.job_id.tolist())]
+        sync_seen_jobs(spreadsheet)
+
+        all_jobs_df_filtered = filter_unseen(all_jobs_df)
+        all_jobs_df_filtered = drop_cross_posted(all_jobs_df_filtered)
         # all_jobs_df_filtered
 
         print(f"There are a total of {all_jobs_df_filtered.shape[0]}"
@@ -205,6 +193,7 @@ if __name__ == "__main__":
         print("Exporting filtered job data...")
         export_to_sheets(spreadsheet=spreadsheet, sheet_name='Geosains Job',
                          df=enriched_all_jobs_df, mode='a')
+        mark_seen(enriched_all_jobs_df)
 
 
 BOT_TOKEN = os.environ['BOT_TOKEN']
@@ -4,11 +4,13 @@ from oauth2client.service_account import ServiceAccountCredentials
 import gspread
 from dotenv import load_dotenv
 import os
-from gspread_dataframe import get_as_dataframe
 import asyncio
 
 from utils.jobstreet import get_job_from_jobstreet_url, enrich_jobstreet
 from utils.gsheet_utils import export_to_sheets
+from utils.concurrency import enrich_concurrently, fetch_listings
+from utils.seen_jobs import drop_cross_posted, get_seen_job_ids
+from utils.seen_keys import filter_unseen, mark_seen
 from utils.telegram_utlis import process_all_jobs
 
 load_dotenv(override=True)
@@ -92,33 +94,18 @@ keywords = ["geologi", "geology", "mining", "mine", "tambang",
 
 urls = [f"https://id.jobstreet.com/id/{keyword}-jobs" for keyword in keywords]
 
-all_jobs_df = pd.concat([
-    get_job_from_jobstreet_url(
-        url=url,
-        proxy_string=proxy_string)
-    for url in urls
-    ])
+previously_scraped_ids = get_seen_job_ids(spreadsheet, 'jobstreet')
+
+all_jobs_df = fetch_listings(
+    get_job_from_jobstreet_url,
+    [{'url': url, 'proxy_string': proxy_string,
+      'seen_ids': previously_scraped_ids} for url in urls],
+    keywords=keywords)
 
 print(f"There are a total of {all_jobs_df.shape[0]} unfiltered jobs..")
 
-previously_scraped_df_sheet = spreadsheet\
-    .worksheet('Geosains Job')
-previously_scraped_df = get_as_dataframe(previously_scraped_df_sheet)
-# previously_scraped_df['job_id'] = pd.to_numeric(
-#    previously_scraped_df['job_id'], errors='coerce')\
-#    .astype('Int64')
-# Then convert to string
-previously_scraped_df = previously_scraped_df[
-    previously_scraped_df['source'] == "jobstreet"]
-previously_scraped_df['job_id'] = previously_scraped_df['job_id']\
-    .astype(str)
-# Replace '<NA>' if you had NaNs and don't want them as strings
-previously_scraped_df['job_id'] = previously_scraped_df['job_id']\
-    .replace('<NA>', pd.NA)
-# previously_scraped_df
-
-all_jobs_df_filtered = all_jobs_df[
-    ~all_jobs_df.job_id.isin(previously_scraped_df.job_id.tolist())]
+all_jobs_df_filtered = filter_unseen(all_jobs_df)
+all_jobs_df_filtered = drop_cross_posted(all_jobs_df_filtered)
 # all_jobs_df_filtered
 
 all_jobs_df_filtered = all_jobs_df_filtered.drop_duplicates()\
@@ -128,12 +115,9 @@ print(f"There are a total of {all_jobs_df_filtered.shape[0]}"
       " filtered jobs..")
 print(all_jobs_df_filtered)
 
-enriched_job_data = []
 # all_jobs_sample = all_jobs_df_filtered.sample(10)
-for index, row in all_jobs_df_filtered.iterrows():
-    enriched_info = enrich_jobstreet(
-        row, proxy_string=proxy_string)
-    enriched_job_data.append(enriched_info)
+enriched_job_data = enrich_concurrently(
+    all_jobs_df_filtered, enrich_jobstreet, proxy_string=proxy_string)
 
 print("Enriching job data...")
 enriched_all_jobs_df = pd.concat(enriched_job_data, ignore_index=True)
@@ -141,6 +125,7 @@ enriched_all_jobs_df = pd.concat(enriched_job_data, ignore_index=True)
 print("Exporting filtered job data...")
 export_to_sheets(spreadsheet=spreadsheet, sheet_name='Geosains Job',
                  df=enriched_all_jobs_df, mode='a')
+mark_seen(enriched_all_jobs_df)
 
 BOT_TOKEN = os.environ['BOT_TOKEN']
 # TARGET_CHAT_ID = "1415309056"
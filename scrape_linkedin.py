@@ -1,3 +1,4 @@
+from contextlib import nullcontext
 from seleniumbase import SB
 import pandas as pd
 from pydrive2.auth import GoogleAuth
@@ -5,11 +6,17 @@ from oauth2client.service_account import ServiceAccountCredentials
 import gspread
 from dotenv import load_dotenv
 import os
-from gspread_dataframe import get_as_dataframe
 import asyncio
 
-from utils.linkedin import get_job_from_linkedin_url, enrich_linkedin
+from utils.concurrency import (MATCHED_KEYWORDS, enrich_concurrently,
+                               fetch_listings, merge_listings)
+from utils.linkedin import (enrich_linkedin, enrich_linkedin_guest,
+                            get_job_from_linkedin_guest,
+                            get_job_from_linkedin_url, search_keyword)
 from utils.gsheet_utils import export_to_sheets
+from utils.seen_jobs import (drop_cross_posted, get_seen_job_ids,
+                             sync_seen_jobs)
+from utils.seen_keys import filter_unseen, mark_seen
 from utils.telegram_utlis import process_all_jobs
 
 load_dotenv(override=True)
@@ -21,6 +28,15 @@ proxy_port = os.environ['PROXY_PORT']
 
 proxy_string = f"{user}:{password}@{proxy_host}:{proxy_port}"
 
+# 'http' lists the searches through LinkedIn's guest endpoint instead of
+# scrolling them in the browser.
+LINKEDIN_LISTING = os.environ.get('LINKEDIN_LISTING', 'browser')
+# 'http' fetches job details from the guest endpoint, concurrently, instead
+# of opening each job in the browser.
+LINKEDIN_DETAILS = os.environ.get('LINKEDIN_DETAILS', 'browser')
+# The browser is only started if one of the steps needs it.
+NEEDS_BROWSER = 'browser' in (LINKEDIN_LISTING, LINKEDIN_DETAILS)
+
 private_key_id = os.environ['SA_PRIVKEY_ID']
 sa_client_email = os.environ['SA_CLIENTMAIL']
 sa_client_x509_url = os.environ['SA_CLIENT_X509_URL']
@@ -148,86 +164,100 @@ urls = [
 ]
 
 
-if __name__ == "__main__":
-    with SB(uc=True, headless=False, xvfb=True,
-            proxy=proxy_string,
-            maximize=True,
-            ) as sb:
-        sb.driver.execute_cdp_cmd(
-                "Network.setExtraHTTPHeaders",
-                {
-                    "headers": {
-                        'Accept': 'text/html,application/xhtml+xml,application\
-                            /xml;q=0.9,image/avif,image/webp,image/apng,*/*;\
-                                q=0.8,application/signed-exchange;v=b3;q=0.7',
-                        'Accept-Encoding': 'gzip, deflate, br, zstd',
-                        'Accept-Language': 'en-US,en;q=0.9',
-                        'Cache-Control': "no-cache",
-                        'Pragma': "no-cache",
-                        'Priority': "u=0, i",
-                        'Sec-Ch-Ua': '"Chromium";v="134", \
-                            "Not:A-Brand";v="24","Google Chrome";v="134"',
-                        'Sec-Ch-Mobile': "?0",
-                        'Sec-Ch-Ua-Platform': '"macOS"',
-                        'Sec-Fetch-Dest': "document",
-                        'Sec-Fetch-Mode': "navigate",
-                        'Sec-Fetch-User': "?1",
-                        'Upgrade-Insecure-Requests': '1',
-                    }
+def setup_browser(sb):
+    """Sets the request headers and user agent used for LinkedIn."""
+    sb.driver.execute_cdp_cmd(
+            "Network.setExtraHTTPHeaders",
+            {
+                "headers": {
+                    'Accept': 'text/html,application/xhtml+xml,application\
+                        /xml;q=0.9,image/avif,image/webp,image/apng,*/*;\
+                            q=0.8,application/signed-exchange;v=b3;q=0.7',
+                    'Accept-Encoding': 'gzip, deflate, br, zstd',
+                    'Accept-Language': 'en-US,en;q=0.9',
+                    'Cache-Control': "no-cache",
+                    'Pragma': "no-cache",
+                    'Priority': "u=0, i",
+                    'Sec-Ch-Ua': '"Chromium";v="134", \
+                        "Not:A-Brand";v="24","Google Chrome";v="134"',
+                    'Sec-Ch-Mobile': "?0",
+                    'Sec-Ch-Ua-Platform': '"macOS"',
+                    'Sec-Fetch-Dest': "document",
+                    'Sec-Fetch-Mode': "navigate",
+                    'Sec-Fetch-User': "?1",
+                    'Upgrade-Insecure-Requests': '1',
                 }
-            )
-
-        sb.driver.execute_cdp_cmd(
-                "Network.setUserAgentOverride",
-                {
-                    "userAgent": "Mozilla/5.0 (Macintosh; Intel Mac OS X \
-                        10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) \
-                            Chrome/134.0.0.0 Safari/537.36"
-                },
-            )
-
-        sb.driver.execute_script("Object.defineProperty(navigator, \
-                                 'webdriver',{get: () => undefined})")
-
-        all_jobs_df = pd.concat([
-            get_job_from_linkedin_url(
-                url=url, sb=sb)
+            }
+        )
+
+    sb.driver.execute_cdp_cmd(
+            "Network.setUserAgentOverride",
+            {
+                "userAgent": "Mozilla/5.0 (Macintosh; Intel Mac OS X \
+                    10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) \
+                        Chrome/134.0.0.0 Safari/537.36"
+            },
+        )
+
+    sb.driver.execute_script("Object.defineProperty(navigator, \
+                             'webdriver',{get: () => undefined})")
+
+
+if __name__ == "__main__":
+    previously_scraped_ids = get_seen_job_ids(
+        spreadsheet, 'linkedin', sheet_name='Scraped not Filtered')
+    # Jobs from the other sources are only in 'Geosains Job', so it is
+    # synced too for drop_cross_posted.
+    sync_seen_jobs(spreadsheet)
+
+    if LINKEDIN_LISTING == 'http':
+        all_jobs_df = fetch_listings(get_job_from_linkedin_guest, [
+            {'url': url, 'proxy_string': proxy_string,
+             'seen_ids': previously_scraped_ids}
             for url in urls
-            ])
-
-        previously_scraped_df_sheet = spreadsheet\
-            .worksheet('Scraped not Filtered')
-        previously_scraped_df = get_as_dataframe(previously_scraped_df_sheet)
-        previously_scraped_df = previously_scraped_df[
-            previously_scraped_df['source'] == "linkedin"]
-        previously_scraped_df['job_id'] = pd.to_numeric(
-            previously_scraped_df['job_id'], errors='coerce')\
-            .astype('Int64')
-        # Then convert to string
-        previously_scraped_df['job_id'] = previously_scraped_df['job_id']\
-            .astype(str)
-        # Replace '<NA>' if you had NaNs and don't want them as strings
-        previously_scraped_df['job_id'] = previously_scraped_df['job_id']\
-            .replace('<NA>', pd.NA)
-        # previously_scraped_df
-
-        all_jobs_df_filtered = all_jobs_df[
-            ~all_jobs_df.job_id.isin(previously_scraped_df.job_id.tolist())]
+        ], keywords=[search_keyword(url) for url in urls])
+
+    browser = SB(uc=True, headless=False, xvfb=True,
+                 proxy=proxy_string,
+                 maximize=True,
+                 ) if NEEDS_BROWSER else nullcontext()
+    with browser as sb:
+        if NEEDS_BROWSER:
+            setup_browser(sb)
+
+        if LINKEDIN_LISTING != 'http':
+            all_jobs_df = merge_listings([
+                get_job_from_linkedin_url(
+                    url=url, sb=sb, seen_ids=previously_scraped_ids)
+                for url in urls
+                ], [search_keyword(url) for url in urls])
+
+        all_jobs_df_filtered = filter_unseen(all_jobs_df)
+        all_jobs_df_filtered = drop_cross_posted(all_jobs_df_filtered)
         # all_jobs_df_filtered
 
-        enriched_job_data = []
-        # all_jobs_sample = all_jobs_df_filtered.sample(10)
-        for index, row in all_jobs_df_filtered.iterrows():
-            enriched_info = enrich_linkedin(row.to_frame().T, sb.driver)
-            enriched_job_data.append(enriched_info)
+        if LINKEDIN_DETAILS == 'http':
+            enriched_job_data = enrich_concurrently(
+                all_jobs_df_filtered, enrich_linkedin_guest,
+                proxy_string=proxy_string)
+        else:
+            enriched_job_data = []
+            # all_jobs_sample = all_jobs_df_filtered.sample(10)
+            for index, row in all_jobs_df_filtered.iterrows():
+                enriched_info = enrich_linkedin(row.to_frame().T, sb.driver)
+                enriched_job_data.append(enriched_info)
 
         print("Enriching job data...")
         enriched_all_jobs_df = pd.concat(enriched_job_data, ignore_index=True)
 
+        enriched_all_jobs_df = enriched_all_jobs_df.drop(
+            columns=MATCHED_KEYWORDS, errors='ignore')
+
         print("Exporting unfiltered job data...")
         export_to_sheets(spreadsheet=spreadsheet,
                          sheet_name='Scraped not Filtered',
                          df=enriched_all_jobs_df, mode='a')
+        mark_seen(enriched_all_jobs_df)
 
         enriched_all_jobs__filtered_df = enriched_all_jobs_df[
             enriched_all_jobs_df.industries.str.contains('Oil and Gas|Mining',
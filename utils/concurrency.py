@@ -0,0 +1,139 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pandas as pd
+
+from utils.gsheet_utils import SHEET_COLUMNS
+from utils.http_session import HOST_CONCURRENCY
+
+# Added by merge_listings. Not a sheet column, so drop it before exporting
+# jobs whose enrich_* function keeps the listing columns.
+MATCHED_KEYWORDS = 'matched_keywords'
+
+
+def _error_row(row, error):
+    # A single-row DataFrame in sheet column order, like the enrich_*
+    # functions return when a job page can't be fetched.
+    record = row.to_dict()
+    record['job_description'] = f"Enrichment failed: {error}"
+    record['get_time'] = datetime.now()
+    columns = SHEET_COLUMNS + [column for column in record
+                               if column not in SHEET_COLUMNS]
+    return pd.DataFrame([record]).reindex(columns=columns)
+
+
+def enrich_concurrently(jobs_df, enrich_func, max_workers=None, **kwargs):
+    """
+    Runs an enrich_* function over every row of a DataFrame in a thread
+    pool.
+
+    The per-domain cap in utils.http_session still limits how many detail
+    requests hit a site at once, so max_workers only needs to be as large
+    as that cap. An exception raised for one job is logged and turned into
+    an error row for that job, so the rest of the batch is kept.
+
+    Args:
+        jobs_df (pd.DataFrame): The jobs to enrich, one per row.
+        enrich_func (callable): Called as enrich_func(row, **kwargs) with
+        each row as a pandas Series.
+        max_workers (int, optional): Number of worker threads. Defaults to
+        the per-domain concurrency cap.
+        **kwargs: Extra keyword arguments passed to enrich_func.
+
+    Returns:
+        list: The enrich_func results, in the same order as jobs_df.
+    """
+    rows = [row for _, row in jobs_df.iterrows()]
+    if not rows:
+        return []
+
+    def enrich(row):
+        try:
+            return enrich_func(row, **kwargs)
+        except Exception as e:
+            print(f"Error enriching {row.get('job_url')}: {e}")
+            return _error_row(row, e)
+
+    max_workers = max_workers or HOST_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(enrich, rows))
+
+
+def fetch_listings(listing_func, listing_kwargs, max_workers=None,
+                   keywords=None):
+    """
+    Fetches several listing pages in parallel and merges the results.
+
+    Requests still go through the per-domain cap in utils.http_session,
+    so pages on the same site share one limit.
+
+    Args:
+        listing_func (callable): A get_job_from_*_url function.
+        listing_kwargs (list): One dict of keyword arguments per page,
+        e.g. [{'url': ..., 'proxy_string': ...}, ...].
+        max_workers (int, optional): Number of worker threads. Defaults to
+        the per-domain concurrency cap.
+        keywords (list, optional): The search keyword of each listing. If
+        given, the results are combined with merge_listings.
+
+    Returns:
+        pandas.DataFrame: All jobs found, concatenated once in the order of
+        listing_kwargs. Empty if no page returned any job.
+    """
+    if not listing_kwargs:
+        return pd.DataFrame()
+
+    max_workers = max_workers or HOST_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda kwargs: listing_func(**kwargs),
+                                    listing_kwargs))
+    if keywords is not None:
+        return merge_listings(results, keywords)
+
+    frames = [df for df in results
+              if isinstance(df, pd.DataFrame) and not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def merge_listings(frames, keywords):
+    """
+    Combines the results of overlapping keyword searches into one row per
+    job_id.
+
+    The first row found for a job is kept, in search order, and the
+    keywords of every search that found it are listed in the
+    MATCHED_KEYWORDS column. Each job is therefore enriched at most once
+    however many searches returned it.
+
+    Args:
+        frames (list): One listing DataFrame (or None) per search.
+        keywords (list): The keyword of each search.
+
+    Returns:
+        pandas.DataFrame: The merged jobs. Empty if no search found any.
+    """
+    jobs = {}
+    listed = 0
+    for jobs_df, keyword in zip(frames, keywords):
+        if not isinstance(jobs_df, pd.DataFrame) or jobs_df.empty:
+            continue
+        for record in jobs_df.to_dict('records'):
+            listed += 1
+            job_id = record.get('job_id')
+            # Jobs without an ID cannot be matched, keep each of them.
+            key = str(job_id) if pd.notna(job_id) else object()
+            if key in jobs:
+                matched = jobs[key][MATCHED_KEYWORDS]
+                if keyword not in matched:
+                    matched.append(keyword)
+            else:
+                record[MATCHED_KEYWORDS] = [keyword]
+                jobs[key] = record
+
+    if not jobs:
+        return pd.DataFrame()
+    print(f"Merged {listed} listed jobs into {len(jobs)} unique jobs.")
+    for record in jobs.values():
+        record[MATCHED_KEYWORDS] = ', '.join(record[MATCHED_KEYWORDS])
+    return pd.DataFrame(list(jobs.values()))
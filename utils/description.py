@@ -0,0 +1,170 @@
+import re
+
+# Tag rewrites shared by the sites whose descriptions are cleaned the way
+# the original R scripts did it.
+_P_BR_P = (r"<p><br\s*/?></p>", "\n\n")
+_STRIPPED_TAGS = (
+    r"<div[^>]*>|<div>|</div>|<ul[^>]*>|<ul>|</li>|</p>|"
+    r"</ol>|<br\s*/?>|<span[^>]*>|<span>|</span>", "")
+_HEADINGS = [
+    (r"<h[1-9][^>]*>", "<strong>"),
+    (r"</h[1-9]>", "</strong>"),
+]
+_BULLET = (r"<li[^>]*>", "\n • ")
+
+# Same as (\n\s*){2,} without the repeated group, which is much slower.
+_BLANK_LINES = (r"\n\s*\n\s*", "\n\n")
+_CLOSE_STRONG = (r"\n\n(?i:</strong>)\n", "\n</strong>\n")
+
+# Whitespace and bullet tidying applied after the tags are rewritten.
+_R_TIDY = [
+    (r"\n\s+\n", "\n\n"),
+    (r"\n\n(?i:<strong>)\n\n", "<strong>\n\n"),
+    (r"•\s*\n(\s*\n)?", "• "),
+    (r"\s+•", " •"),
+    _BLANK_LINES,
+    _CLOSE_STRONG,
+]
+
+_NEWLINES_TABS = re.compile(r"[\n\t]+")
+_WHITESPACE_RUN = re.compile(r"\s{2,}")
+_LINKEDIN_WRAPPER = re.compile(
+    r"(?=<)(?:<div class='show-more-less-html__markup "
+    r"show-more-less-html__markup--clamp-after-5\s+relative "
+    r"overflow-hidden'>|<div class='show-more-less-html__markup "
+    r"relative overflow-hidden'>)",
+    flags=re.IGNORECASE)
+_ADSENSE_PUSH = "(adsbygoogle = window.adsbygoogle || []).push({});"
+# LinkedIn puts the value of these labels on the line after them.
+_LINKEDIN_KEYWORDS = ["Job ID", "Job Type", "Location", "Categories",
+                      "Applications close"]
+_LINKEDIN_LABEL_BREAK = r"\n(?:" + "|".join(
+    rf"(?<=\b{re.escape(keyword)}\n)" for keyword in _LINKEDIN_KEYWORDS
+) + r")\n"
+
+
+def _squish(text):
+    # Tabs and newlines are dropped, any other whitespace run becomes one
+    # space.
+    text = text.replace('\n', '').replace('\t', '').replace('"', "'")
+    return " ".join(text.split())
+
+
+def _prepare_linkedin(text):
+    text = _LINKEDIN_WRAPPER.sub("", text.replace('"', "'"))
+    return _WHITESPACE_RUN.sub(" ", _NEWLINES_TABS.sub(" ", text))
+
+
+def _prepare_disnakerja(text):
+    return _squish(text).replace(_ADSENSE_PUSH, "")
+
+
+def _compile_profile(prepare, tag_rules, tidy_rules, flags=re.IGNORECASE):
+    # Every tag rule becomes one branch of a single alternation, tried in
+    # the order the rules are listed, so one scan rewrites all the tags.
+    # The lookahead lets the scan skip straight to the next '<'.
+    tags = re.compile(
+        "(?=<)(?:" + "|".join(f"({pattern})" for pattern, _ in tag_rules)
+        + ")", flags)
+    replacements = [replacement for _, replacement in tag_rules]
+    tidy = [(re.compile(pattern), replacement)
+            for pattern, replacement in tidy_rules]
+    return {
+        'prepare': prepare,
+        'tags': tags,
+        'replace_tag': lambda match: replacements[match.lastindex - 1],
+        'tidy': tidy,
+    }
+
+
+PROFILES = {
+    'linkedin': _compile_profile(
+        _prepare_linkedin,
+        [
+            (r"<p><br></p>", "\n\n"),
+            (r"</p>|<br\s*/?>", "\n\n"),
+            (r"</ul>", "\n\n"),
+            (r"</li>", "\n"),
+            (r"<div>|</div>|<ul>|</ol>|<span>|</span>", ""),
+            (r"<p>|<ol>", "\n\n"),
+            (r"<li>", "\n • "),
+        ],
+        [
+            (r"•\s*\n", "• "),
+            (r"\s+•", " •"),
+            (r"\n\s*\n\s*\n\s*", "\n\n"),
+            _CLOSE_STRONG,
+            (_LINKEDIN_LABEL_BREAK, "\n"),
+        ]),
+    'jobstreet': _compile_profile(
+        _squish,
+        [
+            _P_BR_P,
+            (r"</ul\s*>", "\n\n"),
+            (r"<h4[^>]*>", "<strong>"),
+            (r"</h4>", "</strong>"),
+            _STRIPPED_TAGS,
+            (r"<p>|<ol>", "\n\n"),
+            _BULLET,
+        ],
+        [
+            (r"•\s*\n", "• "),
+            (r"\s+•", " •"),
+            _BLANK_LINES,
+            _CLOSE_STRONG,
+        ]),
+    'petromindo': _compile_profile(
+        _squish,
+        [_P_BR_P, (r"</ul\s*>", "\n\n")] + _HEADINGS + [
+            _STRIPPED_TAGS,
+            (r"<p[^>]*>|<ol>", "\n\n"),
+            _BULLET,
+        ],
+        _R_TIDY),
+    'disnakerja': _compile_profile(
+        _prepare_disnakerja,
+        [_P_BR_P, (r"</ul\s*>", "\n\n")] + _HEADINGS + [
+            (_STRIPPED_TAGS[0] + r"|"
+             r"<script[^>]*>.*?</script>|<ins[^>]*>.*?</ins>|<hr[^>]*>|"
+             r"<img[^>]*>|<noscript>.*?</noscript>|"
+             r"<iframe[^>]*>.*?</iframe>|<table[^>]*>.*?</table>|"
+             r"<tbody[^>]*>.*?</tbody>", ""),
+            (r"</tr>|</td>", "\n"),
+            (r"<tr>|<td[^>]*>", "\n"),
+            (r"<p[^>]*>|<ol>", "\n\n"),
+            _BULLET,
+        ],
+        _R_TIDY,
+        flags=re.IGNORECASE | re.DOTALL),
+    'indeed': _compile_profile(
+        _squish,
+        [_P_BR_P, (r"</ul>", "\n\n")] + _HEADINGS + [
+            _STRIPPED_TAGS,
+            (r"<p>|<ol>", "\n\n"),
+            _BULLET,
+        ],
+        _R_TIDY),
+}
+
+
+def html_to_telegram(html, profile):
+    """
+    Converts job description HTML into the markup sent to Telegram.
+
+    Block tags become line breaks, list items become bullets and headings
+    become <strong>, with the exact rules depending on the source site.
+    All tags are rewritten in a single scan of the text.
+
+    Args:
+        html (str): The description HTML.
+        profile (str): The source site, one of PROFILES.
+
+    Returns:
+        str: The converted description, stripped of surrounding whitespace.
+    """
+    rules = PROFILES[profile]
+    text = rules['prepare'](html)
+    text = rules['tags'].sub(rules['replace_tag'], text)
+    for pattern, replacement in rules['tidy']:
+        text = pattern.sub(replacement, text)
+    return text.strip()
@@ -1,9 +1,12 @@
-import cloudscraper
 from bs4 import BeautifulSoup, Tag
 import pandas as pd
 from datetime import datetime
-import re
-import time
+
+from utils.description import html_to_telegram
+from utils.http_session import fetch
+from utils.http_cache import fetch_listing, save_listing
+from utils.job_cache import load_cached_job, store_job
+from utils.pagination import MAX_PAGES, crawl_pages
 
 
 def parse_disnakerja(job_card_soup: BeautifulSoup, industries: str):
@@ -16,8 +19,7 @@ def parse_disnakerja(job_card_soup: BeautifulSoup, industries: str):
         industries (str): The industries string to associate with this job.
 
     Returns:
-        pandas.DataFrame: A single-row DataFrame containing extracted job
-        information.
+        dict: The extracted job information, one key per column.
     """
     source = "disnakerja"
     job_id = None
@@ -82,11 +84,30 @@ def parse_disnakerja(job_card_soup: BeautifulSoup, industries: str):
         # 'job_title': None, # Example if title were to be included
     }
 
-    return pd.DataFrame([job_data])
+    return job_data
+
+
+def _select_disnakerja_cards(soup):
+    """
+    Finds the job card <article> elements on a Disnakerja listing page.
+
+    Tries the usual site-container > primary > main chain first and falls
+    back to any <article> inside <main>, so a layout change in one wrapper
+    does not lose the whole page. Articles outside <main>, such as sidebar
+    and related-post widgets, are never taken as jobs.
+    """
+    try:
+        job_cards = soup.select_one("div[id *= 'site-container']")\
+            .select_one("div[id *= 'primary'] > div")\
+            .select_one("main > div").select("article")
+        if job_cards:
+            return job_cards
+    except AttributeError:
+        pass
+    return soup.select("main article")
 
 
-def get_job_from_disnakerja_url(url, industry,
-                                proxy_string=None):
+def _get_disnakerja_page(url, industry, proxy_string=None):
     print(f'Getting job from {url}')
 
     headers = {
@@ -110,20 +131,14 @@ def get_job_from_disnakerja_url(url, industry,
         'sec-ch-ua-platform': '"macOS"',
     }
 
-    proxies_dict = None
-    if proxy_string:
-        proxies_dict = {
-            'http': proxy_string,
-            'https': proxy_string  # Assuming the same proxy for http and https
-        }
-
-    scraper = cloudscraper.create_scraper()
-    response = scraper.get(
-        url=url,
-        # cookies=cookies,
-        headers=headers,
-        proxies=proxies_dict
-    )
+    response, cached_jobs = fetch_listing(url, headers=headers,
+                                          proxy_string=proxy_string)
+    if cached_jobs is not None:
+        return cached_jobs
+    if not 200 <= response.status_code < 300:
+        # Error pages, like the 404 past the last page, have no jobs.
+        print(f"No more results at {url} (status {response.status_code})")
+        return None
 
     soup = BeautifulSoup(response.text, 'html.parser')
 
@@ -132,31 +147,55 @@ def get_job_from_disnakerja_url(url, industry,
 
     # Dapatkan total hasil pencarian
     # Dapatkan elemen job card
-    job_cards = soup.select_one("div[id *= 'site-container']")\
-        .select_one("div[id *= 'primary'] > div")\
-        .select_one("main > div").select("article")
+    job_cards = _select_disnakerja_cards(soup)
 
-    all_jobs_df = []
     print(f"Found {len(job_cards)} job cards on the first page.")
     try:
+        job_records = []
         for job_card in job_cards:
-            job_info_df = parse_disnakerja(job_card, industries=industry)
-            # Correctly check if the DataFrame is not None and not empty
-            if job_info_df is not None and not job_info_df.empty:
-                if job_info_df.iloc[0]['job_id'] is not None:
-                    all_jobs_df.append(job_info_df)
+            job_info = parse_disnakerja(job_card, industries=industry)
+            if job_info['job_id'] is not None:
+                job_records.append(job_info)
 
-        if len(all_jobs_df) > 0:
-            all_jobs_df = pd.concat(all_jobs_df, ignore_index=True)
+        all_jobs_df = pd.DataFrame(job_records)
 
         print("All Jobs Df:")
         print(all_jobs_df)
+        save_listing(url, response, all_jobs_df)
         return all_jobs_df
     except Exception as e:
         print("Error", e)
         return None
 
 
+def get_job_from_disnakerja_url(url, industry, proxy_string=None,
+                                seen_ids=None, max_pages=MAX_PAGES):
+    """
+    Gets the jobs of a Disnakerja industry category, following its
+    /page/N/ pagination.
+
+    Args:
+        url (str): The category URL, e.g.
+        'https://www.disnakerja.com/industri/mining/'.
+        industry (str): The industries string to associate with the jobs.
+        proxy_string (str, optional): Proxy in the form
+        'user:password@host:port'.
+        seen_ids (set, optional): Already scraped job_ids. Crawling stops at
+        the first page made up only of these. If None, only the first page
+        is read.
+        max_pages (int): Maximum number of pages to read.
+
+    Returns:
+        pandas.DataFrame: The jobs found on all pages read.
+    """
+    base_url = url.rstrip('/')
+    return crawl_pages(
+        lambda page: url if page == 1 else f"{base_url}/page/{page}/",
+        lambda page_url: _get_disnakerja_page(page_url, industry,
+                                              proxy_string),
+        seen_ids=seen_ids, max_pages=max_pages)
+
+
 def is_value_empty(value):
     """Checks if a value is None, NaN, or an empty string/list."""
     if value is None:
@@ -170,6 +209,132 @@ def is_value_empty(value):
     return False
 
 
+def extract_disnakerja_details(page_soup):
+    """
+    Reads the enrichable fields from a Disnakerja job page.
+
+    Args:
+        page_soup (BeautifulSoup): The parsed job page.
+
+    Returns:
+        dict: 'job_title', 'job_location', 'employment_type',
+        'seniority_level', 'job_list_date' and 'job_description', each None
+        when missing.
+    """
+    details = {'job_title': None, 'job_location': None,
+               'employment_type': None, 'seniority_level': None,
+               'job_list_date': None, 'job_description': None}
+
+    # Job Title
+    try:
+        title_element = page_soup.select_one("div.entry-meta > span")
+        if title_element:
+            title_text = title_element.get_text(strip=True)
+            details['job_title'] = f"{title_text} Posisi" \
+                if title_text else None
+    except Exception as e_title:
+        print(f"Error parsing job_title: {e_title}")
+        pass
+
+    # Specs Raw (List of <li> elements)
+    specs_elements = []
+    try:
+        # R: html_element("div[id = 'specs'] > ul") %>% html_elements("li")
+        specs_ul = page_soup.select_one("div#specs > ul")
+        if specs_ul:
+            specs_elements = specs_ul.find_all("li", recursive=False)
+    except Exception as e_specs:
+        print(f"Error parsing specs_raw: {e_specs}")
+
+    if not specs_elements:
+        print("Specs section (specs_raw) not found or empty.")
+
+    # Job Location (from specs_elements[2] - 3rd li)
+    try:
+        if len(specs_elements) > 2:
+            location_text = specs_elements[2].get_text(strip=True)
+            location_text = location_text.replace("Lokasi:", "").strip()
+            details['job_location'] = location_text \
+                if location_text else None
+    except Exception as e_loc:
+        print(f"Error parsing job_location: {e_loc}")
+        pass
+
+    # Employment Type (from specs_elements[3] - 4th li)
+    try:
+        if len(specs_elements) > 3:
+            type_text = specs_elements[3].get_text(strip=True)
+            type_text = type_text.replace("Tipe Pekerjaan:", "").strip()
+            details['employment_type'] = type_text\
+                if type_text else None
+    except Exception as e_emptype:
+        print(f"Error parsing employment_type: {e_emptype}")
+        pass
+
+    # Seniority Level (from specs_elements[5] - 6th li)
+    try:
+        if len(specs_elements) > 5:
+            level_text = specs_elements[5].get_text(strip=True)
+            level_text = level_text.replace("Pengalaman:", "").strip()
+            details['seniority_level'] = level_text\
+                if level_text else None
+    except Exception as e_level:
+        print(f"Error parsing seniority_level: {e_level}")
+        pass
+
+    # Job List Date (from specs_elements[0] - 1st li)
+    try:
+        if len(specs_elements) > 0:
+
+            time_element = specs_elements[0]\
+                .select_one("time[itemprop='datePublished']")
+            if time_element:
+                datetime_str = time_element.get('datetime')
+                if datetime_str:
+                    parsed_date = datetime.fromisoformat(
+                        datetime_str.replace("Z", "+00:00")).date()
+                    details['job_list_date'] = parsed_date
+    except Exception as e_date:
+        print(f"Error parsing job_list_date: {e_date}")
+        pass
+    if is_value_empty(details['job_list_date']):
+        details['job_list_date'] = None
+
+    # Job Description
+    description_html_parts = []
+    try:
+        description_container = page_soup.select_one("div#description")
+        if description_container:
+            children = [child for child in description_container.children
+                        if isinstance(child, Tag)]
+            if len(children) > 2 + 4:
+                description_elements_for_processing = children[2:-4]
+                description_html_parts = [
+                    str(el) for el in description_elements_for_processing]
+            elif children:
+                description_elements_for_processing = children
+                description_html_parts = [
+                    str(el) for el in description_elements_for_processing]
+
+    except Exception as e_desc_parts:
+        print(f"Error selecting description parts: {e_desc_parts}")
+
+    if description_html_parts:
+        try:
+            # R: as.character() %>% str_flatten()
+            full_desc_html = "".join(description_html_parts)
+            desc_text = html_to_telegram(full_desc_html, 'disnakerja')
+            details['job_description'] = desc_text or None
+        except Exception as e_desc_clean:
+            print(f"Error cleaning description: {e_desc_clean}")
+            pass
+
+    if is_value_empty(details['job_description']):
+        details['job_description'] = None
+
+    return details
+
+
 def enrich_disnakerja(job_info_series: pd.Series,
                       proxy_string=None):
     """
@@ -191,6 +356,12 @@ def enrich_disnakerja(job_info_series: pd.Series,
         "employment_type", "industries", "job_description", "applicant",
         "get_time"
     ]
+
+    cached_job = load_cached_job('disnakerja', job_info_series.get('job_id'),
+                                 FINAL_COLUMN_ORDER_DISNAKERJA)
+    if cached_job is not None:
+        return cached_job
+
     # Initialize result_data with values from input job_info_series,
     # then override/add new fields.
     result_data = {col: job_info_series.get(col)
@@ -221,17 +392,8 @@ def enrich_disnakerja(job_info_series: pd.Series,
             result_data.setdefault(col, None)
         return pd.DataFrame([result_data])[FINAL_COLUMN_ORDER_DISNAKERJA]
 
-    time.sleep(1)
-
-    proxies_dict = None
-    if proxy_string:
-        proxies_dict = {
-            'http': proxy_string,
-            'https': proxy_string  # Assuming the same proxy for http and https
-        }
     page_soup = None
     error_message_http = None
-    scraper = cloudscraper.create_scraper()
     try:
         headers = {
             'Accept': '*/*',
@@ -253,10 +415,8 @@ def enrich_disnakerja(job_info_series: pd.Series,
             'sec-ch-ua-mobile': '?0',
             'sec-ch-ua-platform': '"macOS"',
         }
-        response = scraper.get(url,
-                               headers=headers,
-                               proxies=proxies_dict,
-                               timeout=15)
+        response = fetch(url, headers=headers,
+                         proxy_string=proxy_string, timeout=15)
         response.raise_for_status()
         page_soup = BeautifulSoup(response.content, 'html.parser')
     except Exception as e:
@@ -264,167 +424,7 @@ def enrich_disnakerja(job_info_series: pd.Series,
         print(f"Error fetching page {url}: {e}")
 
     if page_soup:
-        # Job Title
-        try:
-            title_element = page_soup.select_one("div.entry-meta > span")
-            if title_element:
-                title_text = title_element.get_text(strip=True)
-                result_data['job_title'] = f"{title_text} Posisi" \
-                    if title_text else None
-        except Exception as e_title:
-            print(f"Error parsing job_title: {e_title}")
-            pass
-
-        # Specs Raw (List of <li> elements)
-        specs_elements = []
-        try:
-            # R: html_element("div[id = 'specs'] > ul") %>% html_elements("li")
-            specs_ul = page_soup.select_one("div#specs > ul")
-            if specs_ul:
-                specs_elements = specs_ul.find_all("li", recursive=False)
-        except Exception as e_specs:
-            print(f"Error parsing specs_raw: {e_specs}")
-
-        if not specs_elements:
-            print("Specs section (specs_raw) not found or empty.")
-
-        # Job Location (from specs_elements[2] - 3rd li)
-        try:
-            if len(specs_elements) > 2:
-                location_text = specs_elements[2].get_text(strip=True)
-                location_text = location_text.replace("Lokasi:", "").strip()
-                result_data['job_location'] = location_text \
-                    if location_text else None
-        except Exception as e_loc:
-            print(f"Error parsing job_location: {e_loc}")
-            pass
-
-        # Employment Type (from specs_elements[3] - 4th li)
-        try:
-            if len(specs_elements) > 3:
-                type_text = specs_elements[3].get_text(strip=True)
-                type_text = type_text.replace("Tipe Pekerjaan:", "").strip()
-                result_data['employment_type'] = type_text\
-                    if type_text else None
-        except Exception as e_emptype:
-            print(f"Error parsing employment_type: {e_emptype}")
-            pass
-
-        # Seniority Level (from specs_elements[5] - 6th li)
-        try:
-            if len(specs_elements) > 5:
-                level_text = specs_elements[5].get_text(strip=True)
-                level_text = level_text.replace("Pengalaman:", "").strip()
-                result_data['seniority_level'] = level_text\
-                    if level_text else None
-        except Exception as e_level:
-            print(f"Error parsing seniority_level: {e_level}")
-            pass
-
-        # Job List Date (from specs_elements[0] - 1st li)
-        try:
-            if len(specs_elements) > 0:
-
-                time_element = specs_elements[0]\
-                    .select_one("time[itemprop='datePublished']")
-                if time_element:
-                    datetime_str = time_element.get('datetime')
-                    if datetime_str:
-                        parsed_date = datetime.fromisoformat(
-                            datetime_str.replace("Z", "+00:00")).date()
-                        result_data['job_list_date'] = parsed_date
-        except Exception as e_date:
-            print(f"Error parsing job_list_date: {e_date}")
-            pass
-        if is_value_empty(result_data['job_list_date']):
-            result_data['job_list_date'] = None
-
-        # Job Description
-        description_html_parts = []
-        try:
-            description_container = page_soup.select_one("div#description")
-            if description_container:
-                children = [child for child in description_container.children
-                            if isinstance(child, Tag)]
-                if len(children) > 2 + 4:
-                    description_elements_for_processing = children[2:-4]
-                    description_html_parts = [
-                        str(el) for el in description_elements_for_processing]
-                elif children:
-                    description_elements_for_processing = children
-                    description_html_parts = [
-                        str(el) for el in description_elements_for_processing]
-
-        except Exception as e_desc_parts:
-            print(f"Error selecting description parts: {e_desc_parts}")
-
-        if description_html_parts:
-            try:
-                # R: as.character() %>% str_flatten()
-                full_desc_html = "".join(description_html_parts)
-                desc_text = full_desc_html
-                desc_text = re.sub(r'\n|\t', '', desc_text)
-                desc_text = re.sub(r'\"', "'", desc_text)
-                desc_text = " ".join(desc_text.split()).strip()
-                desc_text = re.sub(r"<p><br\s*/?></p>", "\n\n", desc_text,
-                                   flags=re.IGNORECASE)
-                desc_text = re.sub(r"</ul\s*>", "\n\n", desc_text,
-                                   flags=re.IGNORECASE)
-                desc_text = re.sub(r"<h[1-9][^>]*>", "<strong>", desc_text,
-                                   flags=re.IGNORECASE)
-                desc_text = re.sub(r"</h[1-9]>", "</strong>", desc_text,
-                                   flags=re.IGNORECASE)
-
-                # Extended remove pattern from R
-                tags_to_remove_pattern_disnakerja = (
-                    r"<div[^>]*>|<div>|</div>|<ul[^>]*>|<ul>|</li>|</p>|"
-                    r"</ol>|<br\s*/?>|<span[^>]*>|<span>|</span>|"
-                    r"<script[^>]*>.*?</script>|<ins[^>]*>.*?</ins>|<hr[^>]*>|"
-                    r"<img[^>]*>|<noscript>.*?</noscript>|"
-                    r"<iframe[^>]*>.*?</iframe>|<table[^>]*>.*?</table>|"
-                    r"<tbody[^>]*>.*?</tbody>"
-                )
-                desc_text = re.sub(tags_to_remove_pattern_disnakerja, "",
-                                   desc_text, flags=re.IGNORECASE | re.DOTALL)
-
-                desc_text = desc_text.replace(
-                    "(adsbygoogle = window.adsbygoogle || []).push({});", "")
-                # R: str_remove_all("")
-                desc_text = re.sub(r"", "", desc_text, flags=re.DOTALL)
-
-                # R: str_replace_all("<tr>|</tr>|<td.*?>|</td>", "\n")
-                desc_text = re.sub(r"</tr>|</td>", "\n", desc_text,
-                                   flags=re.IGNORECASE)
-                desc_text = re.sub(r"<tr>|<td[^>]*>", "\n", desc_text,
-                                   flags=re.IGNORECASE)
-
-                desc_text = re.sub(r"<p[^>]*>|<ol>", "\n\n", desc_text,
-                                   flags=re.IGNORECASE)
-
-                # R: str_replace_all("<li>|<li.*?>", "\n • ")
-                desc_text = re.sub(r"<li[^>]*>", "\n • ", desc_text,
-                                   flags=re.IGNORECASE)
-
-                desc_text = re.sub(r"\n\s+\n", "\n\n", desc_text)
-                desc_text = re.sub(r"\n\n<strong>\n\n", "<strong>\n\n",
-                                   desc_text, flags=re.IGNORECASE)
-
-                # R: str_remove_all("•  \n|• \n|• \n\n")
-                desc_text = re.sub(r"•\s*\n(\s*\n)?", "• ", desc_text)
-
-                desc_text = re.sub(r"\s+•", " •", desc_text)
-                desc_text = re.sub(r"(\n\s*){2,}", "\n\n", desc_text)
-                desc_text = re.sub(r"\n\n</strong>\n", "\n</strong>\n",
-                                   desc_text, flags=re.IGNORECASE)
-
-                result_data['job_description'] = desc_text.strip() \
-                    if desc_text and desc_text.strip() else None
-            except Exception as e_desc_clean:
-                print(f"Error cleaning description: {e_desc_clean}")
-                pass
-
-        if is_value_empty(result_data['job_description']):
-            result_data['job_description'] = None
+        result_data.update(extract_disnakerja_details(page_soup))
 
         result_data['get_time'] = datetime.now()
 
@@ -445,4 +445,7 @@ def enrich_disnakerja(job_info_series: pd.Series,
         if col not in final_df.columns:
             final_df[col] = None  # Ensure all columns exist
 
-    return final_df[FINAL_COLUMN_ORDER_DISNAKERJA]
+    final_df = final_df[FINAL_COLUMN_ORDER_DISNAKERJA]
+    if page_soup:
+        store_job(final_df)
+    return final_df
@@ -0,0 +1,167 @@
+"""
+Record-and-replay archive for every page the scrapers fetch.
+
+Set FETCH_ARCHIVE_MODE=record to save each listing and detail response
+(HTTP responses and Selenium page sources alike) into a compressed zip at
+FETCH_ARCHIVE_PATH. Set FETCH_ARCHIVE_MODE=replay to serve them back to the
+same code paths without touching the network or the browser.
+
+A recording run starts a new archive at its first page, replacing any
+archive already at FETCH_ARCHIVE_PATH, so pages are never stale. Record each
+scraper to its own path to keep their archives apart.
+
+The listing and job-detail caches are bypassed while an archive mode is
+active, so a replay always runs the full parsing pipeline.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import zipfile
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+MODE = os.environ.get('FETCH_ARCHIVE_MODE')
+ARCHIVE_PATH = os.environ.get(
+    'FETCH_ARCHIVE_PATH',
+    os.path.join(os.environ.get('GEOSAINS_CACHE_DIR', '.cache'),
+                 'fetch_archive.zip'))
+
+
+class NotArchivedError(requests.exceptions.RequestException, LookupError):
+    """
+    Raised when replaying a page that was not recorded.
+
+    It is a RequestException, so the scrapers handle it like any failed
+    request instead of aborting the run.
+    """
+
+
+_archive_lock = threading.Lock()
+_recorded_names = None
+
+
+def is_active():
+    """Returns True when recording or replaying."""
+    return MODE in ('record', 'replay')
+
+
+def is_replaying():
+    """Returns True when pages are served from the archive."""
+    return MODE == 'replay'
+
+
+def is_recording():
+    """Returns True when fetched pages are saved to the archive."""
+    return MODE == 'record'
+
+
+def _entry_name(key):
+    return f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pkl"
+
+
+def _write(key, entry):
+    global _recorded_names
+    name = _entry_name(key)
+    with _archive_lock:
+        directory = os.path.dirname(ARCHIVE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The first write of a run truncates the archive. Later fetches of
+        # the same key in that run keep the first recording.
+        file_mode = 'w' if _recorded_names is None else 'a'
+        with zipfile.ZipFile(ARCHIVE_PATH, file_mode,
+                             compression=zipfile.ZIP_DEFLATED) as archive:
+            if _recorded_names is None:
+                _recorded_names = set()
+            if name in _recorded_names:
+                return
+            archive.writestr(name, pickle.dumps(dict(entry, key=key)))
+            _recorded_names.add(name)
+
+
+def _read(key):
+    with _archive_lock:
+        try:
+            with zipfile.ZipFile(ARCHIVE_PATH) as archive:
+                return pickle.loads(archive.read(_entry_name(key)))
+        except (FileNotFoundError, KeyError):
+            raise NotArchivedError(f"{key} is not in the fetch archive "
+                                   f"{ARCHIVE_PATH}")
+
+
+def record_response(url, response):
+    """
+    Saves an HTTP response when recording.
+
+    Args:
+        url (str): The requested URL.
+        response (requests.Response): The response to save.
+    """
+    if MODE != 'record':
+        return
+    _write(url, {
+        'url': response.url,
+        'status_code': response.status_code,
+        'headers': dict(response.headers),
+        'encoding': response.encoding,
+        'content': response.content,
+    })
+
+
+def replay_response(url):
+    """
+    Rebuilds a recorded HTTP response.
+
+    Args:
+        url (str): The requested URL.
+
+    Returns:
+        requests.Response: The recorded response.
+
+    Raises:
+        NotArchivedError: If the URL was not recorded.
+    """
+    entry = _read(url)
+    response = requests.Response()
+    response.url = entry['url']
+    response.status_code = entry['status_code']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.encoding = entry['encoding']
+    response._content = entry['content']
+    return response
+
+
+def page_source(key, load_page):
+    """
+    Returns a browser page source through the archive.
+
+    Args:
+        key (str): Identifies the page, usually its URL.
+        load_page (callable): Drives the browser and returns the page
+        source, or None if loading failed. Not called when replaying.
+
+    Returns:
+        str or None: The page source.
+
+    Raises:
+        NotArchivedError: If replaying and the page was not recorded.
+    """
+    if MODE == 'replay':
+        return _read(key)['content']
+    source = load_page()
+    record_page(key, source)
+    return source
+
+
+def record_page(key, source):
+    """
+    Saves a browser page source when recording.
+
+    Args:
+        key (str): Identifies the page, usually its URL.
+        source (str or None): The page source. None is not saved.
+    """
+    if is_recording() and source is not None:
+        _write(key, {'content': source})
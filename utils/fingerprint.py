@@ -0,0 +1,80 @@
+import hashlib
+import re
+
+from utils.gazetteer import resolve_province
+
+# Legal-form words that one site includes in a company name and another
+# leaves out, e.g. "PT Vale Indonesia Tbk" and "Vale Indonesia".
+COMPANY_NOISE_WORDS = {'pt', 'tbk', 'cv', 'persero', 'ltd', 'limited',
+                       'inc', 'co', 'corp', 'corporation'}
+
+_BRACKETED = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _words(text):
+    if not isinstance(text, str):
+        return []
+    return _NON_WORD.sub(' ', text.casefold()).split()
+
+
+def normalize_title(title):
+    """
+    Normalizes a job title for cross-source comparison.
+
+    Case, punctuation and bracketed notes such as "(1)" or "[Urgent]" are
+    dropped.
+
+    Args:
+        title (str): The job title.
+
+    Returns:
+        str: The normalized title, empty if there is none.
+    """
+    if not isinstance(title, str):
+        return ''
+    return ' '.join(_words(_BRACKETED.sub(' ', title)))
+
+
+def normalize_company(company):
+    """
+    Normalizes a company name for cross-source comparison.
+
+    Case, punctuation and legal-form words such as "PT" or "Tbk" are
+    dropped.
+
+    Args:
+        company (str): The company name.
+
+    Returns:
+        str: The normalized name, empty if there is none.
+    """
+    return ' '.join(word for word in _words(company)
+                    if word not in COMPANY_NOISE_WORDS)
+
+
+def job_fingerprint(title, company):
+    """
+    Returns the fingerprint of a job's normalized title and company.
+
+    Args:
+        title (str): The job title.
+        company (str): The company name.
+
+    Returns:
+        str or None: A hex digest, or None if the title or company is
+        missing.
+    """
+    title_key = normalize_title(title)
+    company_key = normalize_company(company)
+    if not title_key or not company_key:
+        return None
+    return hashlib.blake2b(f"{title_key}\x1f{company_key}".encode('utf-8'),
+                           digest_size=8).hexdigest()
+
+
+def location_bucket(location):
+    """
+    Returns the province a job location falls in, or None if unknown.
+    """
+    return resolve_province(location)
@@ -0,0 +1,204 @@
+from collections import Counter
+import re
+
+# The 34 provinces, named the way the job sites write them.
+PROVINCES = [
+    "Aceh", "Sumatera Utara", "Sumatera Barat", "Riau", "Jambi",
+    "Sumatera Selatan", "Bengkulu", "Lampung", "Kepulauan Bangka Belitung",
+    "Kepulauan Riau", "Jakarta", "Jawa Barat", "Jawa Tengah", "Yogyakarta",
+    "Jawa Timur", "Banten", "Bali", "Nusa Tenggara Barat",
+    "Nusa Tenggara Timur", "Kalimantan Barat", "Kalimantan Tengah",
+    "Kalimantan Selatan", "Kalimantan Timur", "Kalimantan Utara",
+    "Sulawesi Utara", "Sulawesi Tengah", "Sulawesi Selatan",
+    "Sulawesi Tenggara", "Gorontalo", "Sulawesi Barat", "Maluku",
+    "Maluku Utara", "Papua Barat", "Papua",
+]
+
+CITY_PROVINCES = {
+    "Pontianak": "Kalimantan Barat",
+    "Sanggau": "Kalimantan Barat",
+    "Palangkaraya": "Kalimantan Tengah",
+    "Banjarmasin": "Kalimantan Selatan",
+    "Banjarbaru": "Kalimantan Selatan",
+    "Samarinda": "Kalimantan Timur",
+    "Balikpapan": "Kalimantan Timur",
+    "Tarakan": "Kalimantan Utara",
+    "Medan": "Sumatera Utara",
+    "Padang": "Sumatera Barat",
+    "Pekanbaru": "Riau",
+    "Palembang": "Sumatera Selatan",
+    "Batam": "Kepulauan Riau",
+    "Bandung": "Jawa Barat",
+    "Bekasi": "Jawa Barat",
+    "Bogor": "Jawa Barat",
+    "Cirebon": "Jawa Barat",
+    "Semarang": "Jawa Tengah",
+    "Cilacap": "Jawa Tengah",
+    "Surabaya": "Jawa Timur",
+    "Gresik": "Jawa Timur",
+    "Tangerang": "Banten",
+    "Cilegon": "Banten",
+    "Denpasar": "Bali",
+    "Mataram": "Nusa Tenggara Barat",
+    "Sumbawa": "Nusa Tenggara Barat",
+    "Kupang": "Nusa Tenggara Timur",
+    "Manado": "Sulawesi Utara",
+    "Morowali": "Sulawesi Tengah",
+    "Palu": "Sulawesi Tengah",
+    "Makassar": "Sulawesi Selatan",
+    "Sorowako": "Sulawesi Selatan",
+    "Kendari": "Sulawesi Tenggara",
+    "Kolaka": "Sulawesi Tenggara",
+    "Ambon": "Maluku",
+    "Ternate": "Maluku Utara",
+    "Halmahera": "Maluku Utara",
+    "Sorong": "Papua Barat",
+    "Jayapura": "Papua",
+    "Timika": "Papua",
+}
+
+# English names used by LinkedIn and some Jobstreet ads.
+PROVINCE_ALIASES = {
+    "DKI Jakarta": "Jakarta",
+    "Jakarta Metropolitan Area": "Jakarta",
+    "North Sumatra": "Sumatera Utara",
+    "West Sumatra": "Sumatera Barat",
+    "South Sumatra": "Sumatera Selatan",
+    "Riau Islands": "Kepulauan Riau",
+    "Bangka Belitung Islands": "Kepulauan Bangka Belitung",
+    "West Java": "Jawa Barat",
+    "Central Java": "Jawa Tengah",
+    "East Java": "Jawa Timur",
+    "Special Region of Yogyakarta": "Yogyakarta",
+    "West Nusa Tenggara": "Nusa Tenggara Barat",
+    "East Nusa Tenggara": "Nusa Tenggara Timur",
+    "West Kalimantan": "Kalimantan Barat",
+    "Central Kalimantan": "Kalimantan Tengah",
+    "South Kalimantan": "Kalimantan Selatan",
+    "East Kalimantan": "Kalimantan Timur",
+    "North Kalimantan": "Kalimantan Utara",
+    "North Sulawesi": "Sulawesi Utara",
+    "Central Sulawesi": "Sulawesi Tengah",
+    "South Sulawesi": "Sulawesi Selatan",
+    "Southeast Sulawesi": "Sulawesi Tenggara",
+    "West Sulawesi": "Sulawesi Barat",
+    "North Maluku": "Maluku Utara",
+    "West Papua": "Papua Barat",
+}
+
+
+def _trie_pattern(spellings):
+    # Shared prefixes are factored out ("kalimantan (?:barat|selatan|...)"),
+    # so the regex engine tries each character once instead of once per
+    # name. Optional tails are greedy, so the longest name wins.
+    trie = {}
+    for spelling in spellings:
+        node = trie
+        for char in spelling:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 \
+            else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+def compile_gazetteer(names, aliases=None):
+    """
+    Compiles a list of place names into a single pattern.
+
+    Names are matched case-insensitively as whole words, longest first, so
+    "Papua Barat" is not also counted as "Papua".
+
+    Args:
+        names (list): The place names to look for.
+        aliases (dict, optional): Other spellings, mapped to one of names.
+
+    Returns:
+        dict: 'pattern', the compiled regex to run on lowercased text, and
+        'canonical', the place name for each lowercased spelling.
+    """
+    canonical = {" ".join(name.lower().split()): " ".join(name.split())
+                 for name in names}
+    for alias, name in (aliases or {}).items():
+        canonical[" ".join(alias.lower().split())] = " ".join(name.split())
+
+    pattern = re.compile(r"\b(" + _trie_pattern(canonical) + r")\b")
+    return {'pattern': pattern, 'canonical': canonical}
+
+
+LOCATION_GAZETTEER = compile_gazetteer(
+    PROVINCES + list(CITY_PROVINCES), PROVINCE_ALIASES)
+
+
+def count_locations(text, gazetteer=LOCATION_GAZETTEER):
+    """
+    Counts every place name of a gazetteer in one scan of the text.
+
+    Args:
+        text (str): The text to scan.
+        gazetteer (dict): A gazetteer built by compile_gazetteer.
+
+    Returns:
+        collections.Counter: Occurrences per place name.
+    """
+    canonical = gazetteer['canonical']
+    return Counter(canonical[spelling]
+                   for spelling in gazetteer['pattern'].findall(text.lower()))
+
+
+def infer_location(text, gazetteer=LOCATION_GAZETTEER):
+    """
+    Picks the place a text mentions most.
+
+    Args:
+        text (str): The text to scan, e.g. a job description.
+        gazetteer (dict): A gazetteer built by compile_gazetteer.
+
+    Returns:
+        str or None: The most mentioned place name, or None if nothing
+        matched or several names tie for the most mentions.
+    """
+    location_counts = count_locations(text, gazetteer)
+    if not location_counts:
+        return None
+
+    max_count = max(location_counts.values())
+    max_locations = [loc for loc, count in location_counts.items()
+                     if count == max_count]
+    if len(max_locations) > 1:
+        print(f"Multiple locations found with max count "
+              f"({max_count}): {max_locations}."
+              f"Setting location to None.")
+        return None
+    return max_locations[0]
+
+
+def resolve_province(location_text):
+    """
+    Resolves a free-form location to its province.
+
+    Works for the location strings of every source, e.g.
+    "Balikpapan, East Kalimantan, Indonesia" or "Sorowako, Sulawesi
+    Selatan".
+
+    Args:
+        location_text (str): The job location.
+
+    Returns:
+        str or None: The province, or None if no known place is mentioned.
+    """
+    if not isinstance(location_text, str):
+        return None
+    match = LOCATION_GAZETTEER['pattern'].search(location_text.lower())
+    if not match:
+        return None
+    name = LOCATION_GAZETTEER['canonical'][match.group(1)]
+    return CITY_PROVINCES.get(name, name)
@@ -1,4 +1,26 @@
+from itertools import zip_longest
+from numbers import Real
+
+from gspread.utils import (Dimension, InsertDataOption, ValueInputOption,
+                           ValueRenderOption, rowcol_to_a1)
 from gspread_dataframe import get_as_dataframe, set_with_dataframe
+import pandas as pd
+
+
+def _cell_value(value):
+    # Renders a DataFrame value for a USER_ENTERED append: empty for
+    # missing values, numbers as they are and anything else as text.
+    # set_with_dataframe only escapes a leading "'"; text starting with "="
+    # is escaped too, so a scraped title or description is never run as a
+    # formula.
+    if pd.isnull(value) is True:
+        return ""
+    if isinstance(value, Real):
+        return value.item() if hasattr(value, 'item') else value
+    value = str(value)
+    if value.startswith(("=", "'")):
+        return f"'{value}"
+    return value
 
 
 def export_to_sheets(spreadsheet, sheet_name, df, mode='r'):
@@ -9,11 +31,98 @@ def export_to_sheets(spreadsheet, sheet_name, df, mode='r'):
                            include_column_header=True, resize=False)
         return True
     elif (mode == 'a'):
-        ws.add_rows(df.shape[0])
-        max_rows = len(ws.get_all_values(major_dimension='rows'))
-        set_with_dataframe(worksheet=ws, dataframe=df, include_index=False,
-                           include_column_header=False, row=max_rows + 1,
-                           resize=False)
+        # One values-append call inserts the rows after the last row of the
+        # table, so the sheet never has to be read first.
+        if df.empty:
+            return True
+        rows = [[_cell_value(value) for value in row]
+                for row in df.itertuples(index=False, name=None)]
+        ws.append_rows(rows, value_input_option=ValueInputOption.user_entered,
+                       insert_data_option=InsertDataOption.insert_rows,
+                       table_range='A1')
         return True
     else:
         return get_as_dataframe(worksheet=ws)
+
+
+def normalize_job_id(job_id):
+    """
+    Converts a job_id read from a sheet to the string form the scrapers use.
+
+    Sheets hand back numeric IDs as floats (e.g. 12345.0), which would never
+    match the '12345' parsed from a listing page.
+    """
+    if isinstance(job_id, float) and job_id.is_integer():
+        return str(int(job_id))
+    return str(job_id)
+
+
+# Column order of the scraped job sheets, as written by the enrich_*
+# functions.
+SHEET_COLUMNS = [
+    "source", "job_id", "job_url", "job_title", "job_company",
+    "job_location", "job_salary", "job_list_date", "seniority_level",
+    "employment_type", "industries", "job_description", "applicant",
+    "get_time"
+]
+
+
+def _column_letter(col):
+    return rowcol_to_a1(1, col).rstrip('0123456789')
+
+
+def _get_columns(ws, columns, start_row):
+    # One values request for the header cells and each column from
+    # start_row down. Returns the header cells and the column values.
+    ranges = [f"{column}1" for column in columns] + [
+        f"{column}{start_row}:{column}{ws.row_count}" for column in columns]
+    value_ranges = ws.batch_get(
+        ranges, major_dimension=Dimension.cols,
+        value_render_option=ValueRenderOption.unformatted)
+    cells = [value_range[0][0] if value_range else ''
+             for value_range in value_ranges[:len(columns)]]
+    values = [value_range[0] if value_range else []
+              for value_range in value_ranges[len(columns):]]
+    return cells, values
+
+
+def read_job_columns(spreadsheet, sheet_name, names, start_row=2):
+    """
+    Reads some columns of the rows from start_row onwards.
+
+    Only the named columns of the requested rows are downloaded, in a
+    single batched request, so a caller that remembers how far it has read
+    can follow an append-only sheet cheaply. Rows and the last row number
+    are returned rather than a set of job IDs, because utils.seen_jobs
+    resumes from that row and reads more than the job_id column.
+
+    Args:
+        spreadsheet (gspread.Spreadsheet): The opened spreadsheet.
+        sheet_name (str): The worksheet to read.
+        names (list): Column names from the header row, e.g.
+        ['source', 'job_id'].
+        start_row (int): The first 1-based row to read. Row 1 is the
+        header.
+
+    Returns:
+        tuple: One tuple of values per row read, in the order of names and
+        with '' for empty cells, and the number of the last row read. The
+        latter is below start_row - 1 if the sheet now has fewer rows than
+        that.
+    """
+    ws = spreadsheet.worksheet(sheet_name)
+    if start_row > ws.row_count:
+        return [], ws.row_count
+
+    columns = [_column_letter(SHEET_COLUMNS.index(name) + 1)
+               for name in names]
+    header, values = _get_columns(ws, columns, start_row)
+    if header != list(names):
+        # The columns were moved, look them up in the header row.
+        header_row = ws.row_values(1)
+        columns = [_column_letter(header_row.index(name) + 1)
+                   for name in names]
+        _, values = _get_columns(ws, columns, start_row)
+
+    rows = list(zip_longest(*values, fillvalue=''))
+    return rows, start_row - 1 + len(rows)
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import pickle
+import threading
+
+from utils import fetch_archive
+from utils.http_session import fetch
+
+CACHE_DIR = os.environ.get('GEOSAINS_CACHE_DIR', '.cache')
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, 'http')
+
+_cache_lock = threading.Lock()
+
+
+def _entry_path(url):
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, f"{key}.pkl")
+
+
+def _load_entry(url):
+    try:
+        with open(_entry_path(url), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def fetch_listing(url, headers=None, proxy_string=None, timeout=None):
+    """
+    Fetches a listing page with a conditional GET.
+
+    If the page was parsed before, the stored ETag and Last-Modified values
+    are sent along. When the server answers 304, or the body hashes to the
+    same value as last time, the jobs parsed from it last time are returned
+    instead of the page needing to be parsed again.
+
+    Args:
+        url (str): The listing page URL.
+        headers (dict, optional): Extra request headers.
+        proxy_string (str, optional): Proxy in the form
+        'user:password@host:port'.
+        timeout (float, optional): Request timeout in seconds.
+
+    Returns:
+        tuple: (response, cached_jobs). cached_jobs is the DataFrame parsed
+        from the unchanged page, or None if the page must be parsed.
+    """
+    entry = None if fetch_archive.is_active() else _load_entry(url)
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry.get('etag'):
+            request_headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            request_headers['If-Modified-Since'] = entry['last_modified']
+
+    response = fetch(url, headers=request_headers,
+                     proxy_string=proxy_string, timeout=timeout)
+
+    if entry is not None:
+        if response.status_code == 304 or \
+                hashlib.sha256(response.content).hexdigest() == \
+                entry.get('content_hash'):
+            print(f"{url} has not changed, reusing the jobs parsed from it.")
+            return response, entry['jobs']
+    return response, None
+
+
+def save_listing(url, response, jobs):
+    """
+    Stores the validators and parsed jobs of a listing page.
+
+    Args:
+        url (str): The listing page URL.
+        response (requests.Response): The 200 response the jobs came from.
+        jobs (pandas.DataFrame): The jobs parsed from the response.
+    """
+    entry = {
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_hash': hashlib.sha256(response.content).hexdigest(),
+        'jobs': jobs,
+    }
+    path = _entry_path(url)
+    with _cache_lock:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f)
+        os.replace(tmp_path, path)
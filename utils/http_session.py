@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import cloudscraper
+import requests
+
+from utils import fetch_archive, rate_limiter
+
+# Maximum number of keep-alive connections kept open per domain.
+POOL_MAXSIZE = 10
+# Number of requests allowed in flight at once per domain.
+HOST_CONCURRENCY = int(os.environ.get('HOST_CONCURRENCY', '4'))
+
+_scrapers = {}
+_scrapers_lock = threading.Lock()
+_host_semaphores = {}
+
+
+def build_proxies(proxy_string=None):
+    """
+    Builds a requests-style proxies dict from a proxy string.
+
+    Args:
+        proxy_string (str, optional): Proxy in the form
+        'user:password@host:port'.
+
+    Returns:
+        dict or None: The proxies dict, or None if no proxy is given.
+    """
+    if not proxy_string:
+        return None
+    return {
+        'http': proxy_string,
+        'https': proxy_string  # Assuming the same proxy for http and https
+    }
+
+
+def get_scraper(url):
+    """
+    Returns the shared cloudscraper session for the domain of a URL.
+
+    The session is created on first use and reused afterwards, so the
+    keep-alive connections and Cloudflare clearance cookies obtained while
+    fetching a listing page are reused for the detail pages of the same
+    domain.
+
+    Args:
+        url (str): Any URL on the target domain.
+
+    Returns:
+        cloudscraper.CloudScraper: The session for that domain.
+    """
+    domain = urlparse(url).netloc
+    with _scrapers_lock:
+        scraper = _scrapers.get(domain)
+        if scraper is None:
+            scraper = cloudscraper.create_scraper()
+            # Re-mount the TLS adapter with a larger pool, keeping the
+            # cipher suite cloudscraper picked for this session.
+            scraper.mount('https://', cloudscraper.CipherSuiteAdapter(
+                cipherSuite=scraper.cipherSuite,
+                ecdhCurve=scraper.ecdhCurve,
+                server_hostname=scraper.server_hostname,
+                source_address=scraper.source_address,
+                ssl_context=scraper.ssl_context,
+                pool_maxsize=POOL_MAXSIZE
+            ))
+            _scrapers[domain] = scraper
+    return scraper
+
+
+def _host_semaphore(domain):
+    with _scrapers_lock:
+        semaphore = _host_semaphores.get(domain)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(HOST_CONCURRENCY)
+            _host_semaphores[domain] = semaphore
+    return semaphore
+
+
+def fetch(url, headers=None, proxy_string=None, timeout=None):
+    """
+    Sends a GET request through the shared session of the URL's domain.
+    At most the domain's concurrency cap of requests run at the same time;
+    extra callers block until a slot frees up. Requests are paced by the
+    domain's adaptive token bucket in utils.rate_limiter, and go through
+    utils.fetch_archive when recording or replaying.
+
+    Args:
+        url (str): The URL to fetch.
+        headers (dict, optional): Extra request headers.
+        proxy_string (str, optional): Proxy in the form
+        'user:password@host:port'.
+        timeout (float, optional): Request timeout in seconds.
+
+    Returns:
+        requests.Response: The response.
+    """
+    if fetch_archive.is_replaying():
+        return fetch_archive.replay_response(url)
+
+    scraper = get_scraper(url)
+    rate_limiter.wait(url)
+    with _host_semaphore(urlparse(url).netloc):
+        start = time.monotonic()
+        try:
+            response = scraper.get(url, headers=headers,
+                                   proxies=build_proxies(proxy_string),
+                                   timeout=timeout)
+        except cloudscraper.exceptions.CloudflareChallengeError:
+            rate_limiter.report(url, status_code=429)
+            raise
+        except (requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError):
+            # Usually the site is overloaded, so slow down before the
+            # next request.
+            rate_limiter.report_failure(url)
+            raise
+
+    body = response.text if response.status_code in (403, 503) else None
+    rate_limiter.report(url, status_code=response.status_code,
+                        latency=time.monotonic() - start, text=body,
+                        retry_after=response.headers.get('Retry-After'))
+    fetch_archive.record_response(url, response)
+    return response
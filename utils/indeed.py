@@ -5,23 +5,24 @@ import pandas as pd
 from bs4 import BeautifulSoup
 import json
 from gspread_dataframe import get_as_dataframe
+from utils import fetch_archive
+from utils.description import html_to_telegram
 from utils.gsheet_utils import export_to_sheets
-import pyautogui
+from utils.job_cache import load_cached_job, store_job
 
 
 def parse_job_card_indeed(job_card_soup):
     """
     Parses a BeautifulSoup object representing a single job card from Indeed,
     aiming to replicate the output of the R function 'get_indeed'.
-    Returns a single-row pandas DataFrame.
+    Returns a plain dict record.
 
     Args:
         job_card_soup (BeautifulSoup Tag): The BeautifulSoup Tag object
         for a job card.
 
     Returns:
-        pandas.DataFrame: A single-row DataFrame containing extracted
-        job information.
+        dict: The extracted job information, one key per column.
     """
     job_data = {
         'source': "indeed",
@@ -203,7 +204,7 @@ def parse_job_card_indeed(job_card_soup):
         print(f"Error parsing job_list_date: {e}")
         pass
 
-    return pd.DataFrame([job_data])
+    return job_data
 
 
 def get_job_from_indeed_url(url, sb):
@@ -227,18 +228,15 @@ def get_job_from_indeed_url(url, sb):
     job_card_selector = "div.result"
     job_cards_initial = soup.select(job_card_selector)
 
-    all_jobs_df = []
     print(f"Found {len(job_cards_initial)} job cards on the first page.")
     try:
+        job_records = []
         for card_soup in job_cards_initial:
-            job_info_df = parse_job_card_indeed(card_soup)
-            # Correctly check if the DataFrame is not None and not empty
-            if job_info_df is not None and not job_info_df.empty:
-                if job_info_df.iloc[0]['job_title'] is not None:
-                    all_jobs_df.append(job_info_df)
+            job_info = parse_job_card_indeed(card_soup)
+            if job_info['job_title'] is not None:
+                job_records.append(job_info)
 
-        if len(all_jobs_df) > 0:
-            all_jobs_df = pd.concat(all_jobs_df, ignore_index=True)
+        all_jobs_df = pd.DataFrame(job_records)
 
         print("All Jobs Df:")
         print(all_jobs_df)
@@ -251,8 +249,7 @@ def get_job_from_indeed_url(url, sb):
         return None
 
 
-def get_job_from_indeed_keyword(keyword, sb):
-    print(f'Getting job from {keyword} keyword..')
+def _load_indeed_keyword_results(keyword, sb):
     # sb.open(url)
     sb.activate_cdp_mode()
     # sb.activate_cdp_mode("https://id.indeed.com")
@@ -277,6 +274,9 @@ def get_job_from_indeed_keyword(keyword, sb):
         return None
     screenshot_path = "./img/ss_checkbox2.png"
 
+    # Imported here because pyautogui needs a display, which the parsers
+    # and the benchmark don't.
+    import pyautogui
     try:
         location = pyautogui.locateOnScreen(screenshot_path,
                                             # confidence=0.8
@@ -295,7 +295,16 @@ def get_job_from_indeed_keyword(keyword, sb):
     sb.uc_gui_click_captcha()
 
     # Scrape the first page
-    page_source = sb.get_page_source()
+    return sb.get_page_source()
+
+
+def get_job_from_indeed_keyword(keyword, sb):
+    print(f'Getting job from {keyword} keyword..')
+    page_source = fetch_archive.page_source(
+        f"indeed-keyword:{keyword}",
+        lambda: _load_indeed_keyword_results(keyword, sb))
+    if page_source is None:
+        return None
     # print("page source")
     # print(page_source)
     soup = BeautifulSoup(page_source, 'html.parser')
@@ -305,22 +314,19 @@ def get_job_from_indeed_keyword(keyword, sb):
     job_card_selector = "div.result"
     job_cards_initial = soup.select(job_card_selector)
 
-    all_jobs_df = []
     print(f"Found {len(job_cards_initial)} job cards on the first page.")
 
     if len(job_cards_initial) == 0:
         return None
     else:
         try:
+            job_records = []
             for card_soup in job_cards_initial:
-                job_info_df = parse_job_card_indeed(card_soup)
-                # Correctly check if the DataFrame is not None and not empty
-                if job_info_df is not None and not job_info_df.empty:
-                    if job_info_df.iloc[0]['job_title'] is not None:
-                        all_jobs_df.append(job_info_df)
+                job_info = parse_job_card_indeed(card_soup)
+                if job_info['job_title'] is not None:
+                    job_records.append(job_info)
 
-            if len(all_jobs_df) > 0:
-                all_jobs_df = pd.concat(all_jobs_df, ignore_index=True)
+            all_jobs_df = pd.DataFrame(job_records)
 
             print("All Jobs Df:")
             print(all_jobs_df)
@@ -334,6 +340,87 @@ def get_job_from_indeed_keyword(keyword, sb):
             return None
 
 
+def _load_indeed_page(url, sb):
+    try:
+        sb.open(url)
+        sb.sleep(3)
+    except Exception as e:
+        print(f"Error navigating to {url}: {e}")
+        return None
+    return sb.get_page_source()
+
+
+def _load_indeed_company_page(company_page_url, job_url, sb):
+    sb.open(company_page_url)
+    sb.uc_gui_handle_cf()
+    sb.sleep(3)
+    company_page_source = sb.get_page_source()
+
+    print(f"Navigating back to original job URL: {job_url}")
+    sb.open(job_url)
+    sb.sleep(1)
+    return company_page_source
+
+
+def extract_indeed_details(page_soup):
+    """
+    Reads the enrichable fields from an Indeed job page.
+
+    Args:
+        page_soup (BeautifulSoup): The parsed job page.
+
+    Returns:
+        dict: 'job_description' and 'job_list_date' (the JSON-LD
+        datePosted), each None when missing.
+    """
+    details = {'job_description': None, 'job_list_date': None}
+
+    # --- Job Description ---
+    try:
+        description_element = page_soup.select_one("div#jobDescriptionText")
+        if description_element:
+            desc_text = html_to_telegram(str(description_element), 'indeed')
+            details['job_description'] = desc_text or None
+        else:
+            details['job_description'] = None
+    except Exception as e:
+        print(f"Error parsing job description: {e}")
+        details['job_description'] = None
+
+    # --- Update job_list_date from script tag (JSON-LD) ---
+    try:
+        script_tags = page_soup.find_all('script', type='application/ld+json')
+        for script in script_tags:
+            if script.string:
+                try:
+                    json_data = json.loads(script.string)
+                    if isinstance(json_data, list):
+                        json_data = json_data[0] if json_data else {}
+
+                    if json_data.get('@type') == 'JobPosting' and \
+                            'datePosted' in json_data:
+                        date_posted_value = json_data['datePosted']
+
+                        if isinstance(date_posted_value, str):
+                            details['job_list_date'] = datetime.strptime(
+                                date_posted_value,
+                                '%Y-%m-%dT%H:%M:%S.%fZ').date()
+                        elif isinstance(date_posted_value, (int, float)):
+                            details['job_list_date'] = datetime.fromtimestamp(
+                                date_posted_value / 1000).date()
+                        break
+                except json.JSONDecodeError:
+                    continue
+                except (TypeError, ValueError) as date_err:
+                    print(f"Error parsing datePosted value"
+                          f"'{json_data.get('datePosted')}': {date_err}")
+                    continue
+    except Exception as e:
+        print(f"Error extracting new_job_list_date from script: {e}")
+
+    return details
+
+
 def enrich_indeed(job_info_series: pd.Series, spreadsheet, sb):
     """
     Enriches a single job's information by visiting its Indeed page.
@@ -358,6 +445,11 @@ def enrich_indeed(job_info_series: pd.Series, spreadsheet, sb):
         "get_time"
     ]
 
+    cached_job = load_cached_job('indeed', job_info_series.get('job_id'),
+                                 FINAL_COLUMN_ORDER)
+    if cached_job is not None:
+        return cached_job
+
     result_data = {col: job_info_series.get(col) for col in FINAL_COLUMN_ORDER}
     result_data.update(job_info_series.to_dict())
 
@@ -382,120 +474,21 @@ def enrich_indeed(job_info_series: pd.Series, spreadsheet, sb):
             result_data.setdefault(col, None)
         return pd.DataFrame([result_data])[FINAL_COLUMN_ORDER]
 
-    try:
-        sb.open(url)
-        sb.sleep(3)
-    except Exception as e:
-        print(f"Error navigating to {url}: {e}")
+    page_source = fetch_archive.page_source(
+        url, lambda: _load_indeed_page(url, sb))
+    if page_source is None:
         # Ensure all columns are present before returning
         for col in FINAL_COLUMN_ORDER:
             result_data.setdefault(col, None)
         result_data['get_time'] = datetime.now()
         return pd.DataFrame([result_data])[FINAL_COLUMN_ORDER]
 
-    page_source = sb.get_page_source()
     soup = BeautifulSoup(page_source, 'html.parser')
 
-    # --- Job Description ---
-    try:
-        description_element = soup.select_one("div#jobDescriptionText")
-        if description_element:
-            desc_html = str(description_element)
-
-            # R: str_remove_all("\n|\t")
-            desc_text = re.sub(r'\n|\t', '', desc_html)
-            # R: str_replace_all('[\"]', "'")
-            desc_text = re.sub(r'\"', "'", desc_text)
-            # R: str_squish()
-            desc_text = " ".join(desc_text.split()).strip()
-
-            # R: str_replace_all("<p><br></p>", "\n\n")
-            desc_text = re.sub(r"<p><br\s*/?></p>", "\n\n", desc_text,
-                               flags=re.IGNORECASE)
-            # R: str_replace_all("</ul>", "\n\n")
-            desc_text = re.sub(r"</ul>", "\n\n", desc_text,
-                               flags=re.IGNORECASE)
-
-            # R: str_replace_all("<(h[1-9]).*?>", "<strong>")
-            desc_text = re.sub(r"<h[1-9][^>]*>", "<strong>", desc_text,
-                               flags=re.IGNORECASE)
-            # R: str_replace_all("</(h[1-9])>", "</strong>")
-            desc_text = re.sub(r"</h[1-9]>", "</strong>", desc_text,
-                               flags=re.IGNORECASE)
-
-            tags_to_remove_pattern = (
-                r"<div[^>]*>|<div>|</div>|<ul[^>]*>|<ul>|"
-                r"</li>|</p>|</ol>|<br\s*/?>|<span[^>]*>|<span>|</span>"
-            )
-            desc_text = re.sub(tags_to_remove_pattern, "", desc_text,
-                               flags=re.IGNORECASE)
-
-            # R: str_replace_all("<p>|<ol>|<br>", "\n\n")
-            desc_text = re.sub(r"<p>|<ol>", "\n\n", desc_text,
-                               flags=re.IGNORECASE)
-
-            # R: str_replace_all("<li>|<li.*?>", "\n • ")
-            desc_text = re.sub(r"<li[^>]*>", "\n • ", desc_text,
-                               flags=re.IGNORECASE)
-
-            # R: str_replace_all("\\n\\s+\\n", "\n\n")
-            desc_text = re.sub(r"\n\s+\n", "\n\n", desc_text)
-            desc_text = re.sub(r"\n\n<strong>\n\n", "<strong>\n\n", desc_text,
-                               flags=re.IGNORECASE)
-
-            # R: str_remove_all("•  \n|• \n|• \n\n")
-            desc_text = re.sub(r"•\s*\n(\s*\n)?", "• ", desc_text)
-
-            # R: str_replace_all("  •", " •")
-            desc_text = re.sub(r"\s+•", " •", desc_text)
-            # R: str_replace_all("(\n{2})\n+", "\n\n")
-            desc_text = re.sub(r"(\n\s*){2,}", "\n\n", desc_text)
-            # R: str_replace_all("\n\n</strong>\n", "\n</strong>\n")
-            desc_text = re.sub(r"\n\n</strong>\n", "\n</strong>\n", desc_text,
-                               flags=re.IGNORECASE)
-
-            result_data['job_description'] = desc_text.strip() \
-                if desc_text else None
-        else:
-            result_data['job_description'] = None
-    except Exception as e:
-        print(f"Error parsing job description: {e}")
-        result_data['job_description'] = None
-
-    # --- Update job_list_date from script tag (JSON-LD) ---
-    new_job_list_date_parsed = None
-    try:
-        script_tags = soup.find_all('script', type='application/ld+json')
-        for script in script_tags:
-            if script.string:
-                try:
-                    json_data = json.loads(script.string)
-                    if isinstance(json_data, list):
-                        json_data = json_data[0] if json_data else {}
-
-                    if json_data.get('@type') == 'JobPosting' and \
-                            'datePosted' in json_data:
-                        date_posted_value = json_data['datePosted']
-
-                        if isinstance(date_posted_value, str):
-                            new_job_list_date_parsed = datetime.strptime(
-                                date_posted_value,
-                                '%Y-%m-%dT%H:%M:%S.%fZ').date()
-                        elif isinstance(date_posted_value, (int, float)):
-                            new_job_list_date_parsed = datetime.fromtimestamp(
-                                date_posted_value / 1000).date()
-                        break
-                except json.JSONDecodeError:
-                    continue
-                except (TypeError, ValueError) as date_err:
-                    print(f"Error parsing datePosted value"
-                          f"'{json_data.get('datePosted')}': {date_err}")
-                    continue
-    except Exception as e:
-        print(f"Error extracting new_job_list_date from script: {e}")
-
-    if new_job_list_date_parsed:
-        result_data['job_list_date'] = new_job_list_date_parsed
+    page_details = extract_indeed_details(soup)
+    result_data['job_description'] = page_details['job_description']
+    if page_details['job_list_date']:
+        result_data['job_list_date'] = page_details['job_list_date']
 
     # --- Industries Logic ---
     current_company_name = result_data.get('job_company')
@@ -531,14 +524,13 @@ def enrich_indeed(job_info_series: pd.Series, spreadsheet, sb):
                     if not company_page_url.startswith('http'):
                         # Attempt to construct absolute URL if relative
                         from urllib.parse import urljoin
-                        company_page_url = urljoin(sb.get_current_url(),
-                                                   company_page_url)
+                        company_page_url = urljoin(url, company_page_url)
 
                     print(f"Navigating to company page: {company_page_url}")
-                    sb.open(company_page_url)
-                    sb.uc_gui_handle_cf()
-                    sb.sleep(3)
-                    company_page_source = sb.get_page_source()
+                    company_page_source = fetch_archive.page_source(
+                        company_page_url,
+                        lambda: _load_indeed_company_page(company_page_url,
+                                                          url, sb))
                     company_soup = BeautifulSoup(company_page_source,
                                                  'html.parser')
 
@@ -578,10 +570,6 @@ def enrich_indeed(job_info_series: pd.Series, spreadsheet, sb):
                     #     except Exception as e:
                     #         print(f"Error writing to sheet {e}")
 
-                    print(f"Navigating back to original job URL: {url}")
-                    sb.open(url)
-                    sb.sleep(1)
-
             current_industries = new_scraped_industries
         except Exception as e_scrape_ind:
             print(f"Error scraping industry for {current_company_name}:"
@@ -600,4 +588,6 @@ def enrich_indeed(job_info_series: pd.Series, spreadsheet, sb):
         if col not in final_df.columns:
             final_df[col] = None
 
-    return final_df[FINAL_COLUMN_ORDER]
+    final_df = final_df[FINAL_COLUMN_ORDER]
+    store_job(final_df)
+    return final_df
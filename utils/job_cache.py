@@ -0,0 +1,106 @@
+import os
+import pickle
+import sqlite3
+import time
+
+import pandas as pd
+
+from utils import fetch_archive
+from utils.http_cache import CACHE_DIR
+
+JOB_CACHE_PATH = os.path.join(CACHE_DIR, 'jobs.sqlite')
+# Enriched jobs older than this are dropped and fetched again.
+JOB_CACHE_TTL_HOURS = float(os.environ.get('JOB_CACHE_TTL_HOURS', '72'))
+
+_evicted = False
+
+
+def _connect():
+    global _evicted
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(JOB_CACHE_PATH, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS enriched_jobs ("
+        " source TEXT NOT NULL,"
+        " job_id TEXT NOT NULL,"
+        " stored_at REAL NOT NULL,"
+        " record BLOB NOT NULL,"
+        " PRIMARY KEY (source, job_id))"
+    )
+    if not _evicted:
+        with conn:
+            conn.execute("DELETE FROM enriched_jobs WHERE stored_at < ?",
+                         (time.time() - JOB_CACHE_TTL_HOURS * 3600,))
+        _evicted = True
+    return conn
+
+
+def _job_key(job_id):
+    if job_id is None or (isinstance(job_id, float) and pd.isna(job_id)):
+        return None
+    return str(job_id)
+
+
+def load_cached_job(source, job_id, columns=None):
+    """
+    Looks up a previously enriched job.
+
+    Args:
+        source (str): The job source, e.g. 'jobstreet'.
+        job_id: The job ID within that source.
+        columns (list, optional): Column order for the returned DataFrame.
+
+    Returns:
+        pandas.DataFrame or None: A single-row DataFrame with the cached
+        enriched job, or None if it is not cached or has expired.
+    """
+    key = _job_key(job_id)
+    if key is None or fetch_archive.is_active():
+        return None
+
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT record FROM enriched_jobs"
+            " WHERE source = ? AND job_id = ? AND stored_at >= ?",
+            (source, key, time.time() - JOB_CACHE_TTL_HOURS * 3600)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+
+    print(f"Using cached details for {source} job {key}")
+    cached_df = pd.DataFrame([pickle.loads(row[0])])
+    if columns is not None:
+        for col in columns:
+            if col not in cached_df.columns:
+                cached_df[col] = None
+        cached_df = cached_df[columns]
+    return cached_df
+
+
+def store_job(job_df):
+    """
+    Caches an enriched job so a later run can skip fetching it again.
+
+    Args:
+        job_df (pandas.DataFrame): A single-row DataFrame returned by one of
+        the enrich_* functions. Its 'source' and 'job_id' form the key.
+    """
+    record = job_df.iloc[0].to_dict()
+    key = _job_key(record.get('job_id'))
+    if key is None:
+        return
+
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO enriched_jobs"
+                " (source, job_id, stored_at, record) VALUES (?, ?, ?, ?)",
+                (record.get('source'), key, time.time(),
+                 pickle.dumps(record))
+            )
+    finally:
+        conn.close()
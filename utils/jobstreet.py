@@ -3,11 +3,15 @@ from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
 import re
-import time
 import requests
-import random
 import json
 
+from utils.description import html_to_telegram
+from utils.http_session import fetch
+from utils.http_cache import fetch_listing, save_listing
+from utils.job_cache import load_cached_job, store_job
+from utils.pagination import MAX_PAGES, crawl_pages
+
 
 def parse_jobstreet(job_card):
     job_id = job_card.get('data-job-id')
@@ -48,10 +52,10 @@ def parse_jobstreet(job_card):
 
     })
 
-    return pd.DataFrame([result])
+    return result
 
 
-def get_job_from_jobstreet_url(url, proxy_string=None):
+def _get_jobstreet_page(url, proxy_string=None):
     print(f'Getting job from {url}')
 
     headers = {
@@ -78,20 +82,14 @@ def get_job_from_jobstreet_url(url, proxy_string=None):
         # 'x-datadog-trace-id': '16471256710346544044',
     }
 
-    proxies_dict = None
-    if proxy_string:
-        proxies_dict = {
-            'http': proxy_string,
-            'https': proxy_string  # Assuming the same proxy for http and https
-        }
-
-    scraper = cloudscraper.create_scraper()
-    response = scraper.get(
-        url=url,
-        # cookies=cookies,
-        headers=headers,
-        proxies=proxies_dict
-    )
+    response, cached_jobs = fetch_listing(url, headers=headers,
+                                          proxy_string=proxy_string)
+    if cached_jobs is not None:
+        return cached_jobs
+    if not 200 <= response.status_code < 300:
+        # Error pages, like the 404 past the last page, have no jobs.
+        print(f"No more results at {url} (status {response.status_code})")
+        return None
 
     soup = BeautifulSoup(response.text, 'html.parser')
 
@@ -103,27 +101,240 @@ def get_job_from_jobstreet_url(url, proxy_string=None):
     job_cards = soup.find_all('article',
                               attrs={"data-automation": "normalJob"})
 
-    all_jobs_df = []
     print(f"Found {len(job_cards)} job cards on the first page.")
     try:
+        job_records = []
         for job_card in job_cards:
-            job_info_df = parse_jobstreet(job_card)
-            # Correctly check if the DataFrame is not None and not empty
-            if job_info_df is not None and not job_info_df.empty:
-                if job_info_df.iloc[0]['job_title'] is not None:
-                    all_jobs_df.append(job_info_df)
+            job_info = parse_jobstreet(job_card)
+            if job_info['job_title'] is not None:
+                job_records.append(job_info)
 
-        if len(all_jobs_df) > 0:
-            all_jobs_df = pd.concat(all_jobs_df, ignore_index=True)
+        all_jobs_df = pd.DataFrame(job_records)
 
         print("All Jobs Df:")
         print(all_jobs_df)
+        save_listing(url, response, all_jobs_df)
         return all_jobs_df
     except Exception as e:
         print("Error", e)
         return None
 
 
+def get_job_from_jobstreet_url(url, proxy_string=None, seen_ids=None,
+                               max_pages=MAX_PAGES):
+    """
+    Gets the jobs of a Jobstreet keyword search, following its pagination.
+
+    Args:
+        url (str): The search URL, e.g.
+        'https://id.jobstreet.com/id/geologi-jobs'.
+        proxy_string (str, optional): Proxy in the form
+        'user:password@host:port'.
+        seen_ids (set, optional): Already scraped job_ids. Crawling stops at
+        the first page made up only of these. If None, only the first page
+        is read.
+        max_pages (int): Maximum number of result pages to read.
+
+    Returns:
+        pandas.DataFrame: The jobs found on all pages read.
+    """
+    return crawl_pages(
+        lambda page: url if page == 1 else f"{url}?page={page}",
+        lambda page_url: _get_jobstreet_page(page_url, proxy_string),
+        seen_ids=seen_ids, max_pages=max_pages)
+
+
+SEEK_STATE_PATTERNS = [
+    re.compile(r"window\.SEEK_REDUX_DATA\s*=\s*"),
+    re.compile(r"window\.SEEK_APOLLO_DATA\s*=\s*"),
+]
+
+
+def find_seek_job(page_text):
+    """
+    Finds the job embedded in a JobStreet job page's server state.
+
+    The page assigns window.SEEK_REDUX_DATA (and on newer pages
+    window.SEEK_APOLLO_DATA) in a script tag. The object literal is decoded
+    in place, so no HTML tree is needed.
+
+    Args:
+        page_text (str): The job page HTML.
+
+    Returns:
+        dict or None: The job object, or None if the page has no usable
+        server state.
+    """
+    decoder = json.JSONDecoder()
+    for pattern in SEEK_STATE_PATTERNS:
+        match = pattern.search(page_text)
+        if not match:
+            continue
+        try:
+            data, _ = decoder.raw_decode(page_text, match.end())
+        except ValueError as e_json:
+            print(f"Error decoding {pattern.pattern}: {e_json}")
+            continue
+        if not isinstance(data, dict):
+            continue
+
+        job = None
+        if 'jobdetails' in data:
+            # Expired ads come with a null result.
+            details = data.get('jobdetails')
+            result = details.get('result') \
+                if isinstance(details, dict) else None
+            if isinstance(result, dict):
+                job = result.get('job')
+        elif isinstance(data.get('ROOT_QUERY'), dict):
+            for key, value in data['ROOT_QUERY'].items():
+                if key.startswith('jobDetails:') and isinstance(value, dict):
+                    job = value.get('job')
+                    break
+        if isinstance(job, dict):
+            return job
+    return None
+
+
+def _listed_date(seek_job):
+    """Returns the date a SEEK job was listed, or None."""
+    try:
+        date_posted_str = (seek_job.get('listedAt') or {}).get('dateTimeUtc')
+        if not date_posted_str:
+            return None
+        if date_posted_str.endswith('Z'):
+            dt_obj = datetime.strptime(date_posted_str,
+                                       '%Y-%m-%dT%H:%M:%S.%fZ')
+        else:
+            dt_obj = datetime.fromisoformat(
+                date_posted_str.replace('Z', '+00:00'))
+        return dt_obj.date()
+    except Exception as e_date:
+        print(f"Error parsing listedAt: {e_date}")
+        return None
+
+
+def _join_description_parts(description_elements_html):
+    """
+    Converts the top-level elements of a job ad and joins them.
+
+    Args:
+        description_elements_html (list): HTML of each top-level element.
+
+    Returns:
+        str or None: The description, or None if every part is empty.
+    """
+    cleaned_description_parts = []
+    for html_part in description_elements_html:
+        try:
+            cleaned_description_parts.append(
+                html_to_telegram(html_part, 'jobstreet'))
+        except Exception as e_clean:
+            print(f"Error cleaning description part: {e_clean}")
+            cleaned_description_parts.append(html_part)
+
+    final_job_description = "\n\n".join(
+        filter(None, cleaned_description_parts))
+    if not final_job_description.strip():
+        return None
+    return final_job_description
+
+
+def details_from_seek_job(seek_job):
+    """
+    Reads the enrichable fields from an embedded SEEK job.
+
+    Args:
+        seek_job (dict): The job object returned by find_seek_job.
+
+    Returns:
+        dict: 'job_description', 'industries', 'employment_type' and
+        'job_list_date', each None when missing.
+    """
+    # The ad HTML is split into its top-level elements like the rendered
+    # page is, which only needs a tree of the ad fragment itself.
+    ad_soup = BeautifulSoup(seek_job.get('content') or '', 'html.parser')
+    description_elements_html = [
+        str(child) for child in ad_soup.find_all(recursive=False)] or \
+        [str(ad_soup)]
+
+    classifications = seek_job.get('classifications')
+    industries = classifications[0].get('label') \
+        if isinstance(classifications, list) and classifications and \
+        isinstance(classifications[0], dict) else None
+
+    # workTypes is a single object on most pages and a list on some.
+    work_types = seek_job.get('workTypes')
+    if isinstance(work_types, list):
+        work_types = work_types[0] if work_types else None
+    employment_type = work_types.get('label') \
+        if isinstance(work_types, dict) else None
+
+    return {
+        'job_description': _join_description_parts(
+            description_elements_html),
+        'industries': industries,
+        'employment_type': employment_type,
+        'job_list_date': _listed_date(seek_job),
+    }
+
+
+def details_from_page_soup(page_soup):
+    """
+    Reads the enrichable fields from a rendered JobStreet job page.
+
+    Args:
+        page_soup (BeautifulSoup): The parsed job page.
+
+    Returns:
+        dict: 'job_description', 'industries' and 'employment_type', each
+        None when missing.
+    """
+    details = {'job_description': None, 'industries': None,
+               'employment_type': None}
+
+    desc_info_raw = None
+    try:
+        selector_desc_info = "div[data-automation*='jobAdDetails'] > div"
+        desc_info_raw = page_soup.select_one(selector_desc_info)
+    except Exception as e_desc_raw:
+        print(f"Error selecting desc_info_raw: {e_desc_raw}")
+
+    if desc_info_raw:
+        try:
+            all_children = list(desc_info_raw.find_all(recursive=False))
+            if all_children:
+                description_elements_html = [
+                    str(child) for child in all_children[:-1]]
+            else:
+                description_elements_html = [str(desc_info_raw)]
+            details['job_description'] = _join_description_parts(
+                description_elements_html)
+        except Exception as e_desc_children:
+            print(f"Error processing description"
+                  f"children: {e_desc_children}")
+
+    try:
+        industry_element = page_soup\
+            .select_one(
+                "span[data-automation='job-detail-classifications'] > a"
+                )
+        if industry_element:
+            details['industries'] = industry_element.get_text()
+    except Exception as e:
+        print(f"Error getting industries: {e}")
+
+    try:
+        employment_type_element = page_soup\
+            .select_one("span[data-automation='job-detail-work-type'] > a")
+        if employment_type_element:
+            details['employment_type'] = employment_type_element.get_text()
+    except Exception as e:
+        print(f"Error getting employment_type: {e}")
+
+    return details
+
+
 def enrich_jobstreet(job_info_series: pd.Series,
                      proxy_string=None):
     """
@@ -147,6 +358,11 @@ def enrich_jobstreet(job_info_series: pd.Series,
         "get_time"
     ]
 
+    cached_job = load_cached_job('jobstreet', job_info_series.get('job_id'),
+                                 FINAL_COLUMN_ORDER)
+    if cached_job is not None:
+        return cached_job
+
     headers = {
         'accept': 'application/json, text/plain, */*',
         'accept-language': 'en-US,en;q=0.9',
@@ -197,202 +413,42 @@ def enrich_jobstreet(job_info_series: pd.Series,
             result_data.setdefault(col, None)
         return pd.DataFrame([result_data])[FINAL_COLUMN_ORDER]
 
-    time.sleep(random.randint(1, 3))
-
-    # --- Inlined safe_read_html_python logic ---
-
-    proxies_dict = None
-    if proxy_string:
-        proxies_dict = {
-            'http': proxy_string,
-            'https': proxy_string  # Assuming the same proxy for http and https
-        }
-    page_soup = None
+    page_content = None
     error_message = None
-    scraper = cloudscraper.create_scraper()
     try:
-        response = scraper.get(url,
-                               headers=headers,
-                               proxies=proxies_dict,
-                               timeout=20)
+        response = fetch(url, headers=headers,
+                         proxy_string=proxy_string, timeout=20)
         response.raise_for_status()
-        page_soup = BeautifulSoup(response.content, 'html.parser')
+        page_content = response.content
     except cloudscraper.exceptions.CloudflareChallengeError as e_cf:
         error_message = str(f"Cloudflare challenge encountered: {e_cf}")
     except requests.exceptions.RequestException as e_req:
         error_message = str(f"Request failed: {e_req}")
-    except Exception as e_parse:
-        error_message = str(f"HTML parsing or other error: {e_parse}")
-    # --- End of inlined safe_read_html_python logic ---
 
-    if page_soup:
-        desc_info_raw = None
+    page_details = None
+    if page_content:
+        seek_job = None
         try:
-            selector_desc_info = "div[data-automation*='jobAdDetails'] > div"
-            desc_info_raw = page_soup.select_one(selector_desc_info)
-        except Exception as e_desc_raw:
-            print(f"Error selecting desc_info_raw: {e_desc_raw}")
-            pass
-
-        description_elements_html = []
-        if desc_info_raw:
+            seek_job = find_seek_job(page_content.decode('utf-8', 'replace'))
+            if seek_job is not None and seek_job.get('content'):
+                page_details = details_from_seek_job(seek_job)
+        except Exception as e_seek:
+            print(f"Error reading the embedded job: {e_seek}")
+        if page_details is None:
+            # No usable embedded state, fall back to walking the page.
             try:
-                all_children = list(desc_info_raw.find_all(recursive=False))
-                if all_children:
-                    description_elements_html = [
-                        str(child) for child in all_children[:-1]]
-                else:
-                    description_elements_html = [str(desc_info_raw)]
-            except Exception as e_desc_children:
-                print(f"Error processing description"
-                      f"children: {e_desc_children}")
-                pass
-
-        cleaned_description_parts = []
-        if description_elements_html:
-            for html_part in description_elements_html:
-                try:
-                    desc_text = html_part
-                    desc_text = re.sub(r'\n|\t', '', desc_text)
-                    desc_text = re.sub(r'\"', "'", desc_text)
-                    desc_text = " ".join(desc_text.split()).strip()
-                    desc_text = re.sub(r"<p><br\s*/?></p>", "\n\n",
-                                       desc_text, flags=re.IGNORECASE)
-                    desc_text = re.sub(r"</ul\s*>", "\n\n",
-                                       desc_text, flags=re.IGNORECASE)
-                    desc_text = re.sub(r"<h4[^>]*>", "<strong>",
-                                       desc_text, flags=re.IGNORECASE)
-                    desc_text = re.sub(r"</h4>", "</strong>",
-                                       desc_text, flags=re.IGNORECASE)
-                    tags_to_remove_pattern = (
-                        r"<div[^>]*>|<div>|</div>|<ul[^>]*>|<ul>|</li>|</p>|"
-                        r"</ol>|<br\s*/?>|<span[^>]*>|<span>|</span>"
-                    )
-                    desc_text = re.sub(tags_to_remove_pattern, "",
-                                       desc_text, flags=re.IGNORECASE)
-                    desc_text = re.sub(r"<p>|<ol>", "\n\n",
-                                       desc_text, flags=re.IGNORECASE)
-                    desc_text = re.sub(r"<li[^>]*>", "\n • ",
-                                       desc_text, flags=re.IGNORECASE)
-                    desc_text = re.sub(r"•\s*\n", "• ", desc_text)
-                    desc_text = re.sub(r"\s+•", " •", desc_text)
-                    desc_text = re.sub(r"(\n\s*){2,}", "\n\n", desc_text)
-                    desc_text = re.sub(r"\n\n</strong>\n", "\n</strong>\n",
-                                       desc_text, flags=re.IGNORECASE)
-                    cleaned_description_parts.append(desc_text.strip())
-                except Exception as e_clean:
-                    print(f"Error cleaning description part: {e_clean}")
-                    cleaned_description_parts.append(html_part)
-
-        final_job_description = None
-        if cleaned_description_parts:
-            # --- Inlined is_empty_python logic for all parts ---
-            all_parts_empty = True
-            for part in cleaned_description_parts:
-                if not (part is None or (
-                    isinstance(part, float) and pd.isna(part)
-                    )
-                      or (isinstance(part, str) and not part.strip())):
-                    all_parts_empty = False
-                    break
-            # --- End of inlined is_empty_python logic ---
-            if all_parts_empty:
-                final_job_description = None
-            else:
-                final_job_description = "\n\n".join(
-                    filter(None, cleaned_description_parts))
-                if not final_job_description.strip():
-                    final_job_description = None
-
-        result_data['job_description'] = final_job_description
-
-        try:
-            industry_element = page_soup\
-                .select_one(
-                    "span[data-automation='job-detail-classifications'] > a"
-                    )
-            if industry_element:
-                industry = industry_element.get_text()
-                result_data['industries'] = industry
-        except Exception as e:
-            print(f"Error getting industries: {e}")
-            pass
-
-        try:
-            employment_type_element = page_soup\
-                .select_one("span[data-automation='job-detail-work-type'] > a")
-            if employment_type_element:
-                employment_type = employment_type_element.get_text()
-                result_data['employment_type'] = employment_type
-        except Exception as e:
-            print(f"Error getting employment_type: {e}")
-            pass
-
-        new_job_list_date_parsed = None
-        try:
-            server_state_script = page_soup.find('script',
-                                                 attrs={'data-automation':
-                                                        'server-state'})
-            if server_state_script and server_state_script.string:
-                script_content = server_state_script.string
-
-                # Try to extract SEEK_REDUX_DATA
-                redux_pattern = r"window\.SEEK_REDUX_DATA\s*=\s*(\{.*?\});"
-                redux_data_match = re.search(redux_pattern,
-                                             script_content, re.DOTALL)
-                if redux_data_match:
-                    json_str = redux_data_match.group(1)
-                    data = json.loads(json_str)
-                    date_posted_str = data.get('jobdetails', {})\
-                        .get('result', {}).get('job', {})\
-                        .get('listedAt', {}).get('dateTimeUtc')
-                    if date_posted_str:
-                        if date_posted_str.endswith('Z'):
-                            dt_obj = datetime.strptime(date_posted_str,
-                                                       '%Y-%m-%dT%H:%M:%S.%fZ')
-                        else:
-                            dt_obj = datetime.fromisoformat(
-                                date_posted_str.replace('Z', '+00:00'))
-                        new_job_list_date_parsed = dt_obj.date()
-
-                if not new_job_list_date_parsed:
-                    apollo_pattern = (r"window\.SEEK_APOLLO_DATA"
-                                      r"\s*=\s*(\{.*?\});")
-                    apollo_data_match = re.search(apollo_pattern,
-                                                  script_content, re.DOTALL)
-                    if apollo_data_match:
-                        json_str = apollo_data_match.group(1)
-                        data = json.loads(json_str)
-                        # We need to find the key that contains "jobDetails"
-                        job_details_key = None
-                        for key in data.get("ROOT_QUERY", {}).keys():
-                            if key.startswith("jobDetails:"):
-                                job_details_key = key
-                                break
-
-                        if job_details_key:
-                            date_posted_str = data.get("ROOT_QUERY", {})\
-                                .get(job_details_key, {}).get('job', {})\
-                                .get('listedAt', {}).get('dateTimeUtc')
-                            if date_posted_str:
-                                if date_posted_str.endswith('Z'):
-                                    dt_obj = datetime\
-                                        .strptime(date_posted_str,
-                                                  '%Y-%m-%dT%H:%M:%S.%fZ')
-                                else:
-                                    dt_obj = datetime.fromisoformat(
-                                        date_posted_str.replace('Z', '+00:00'))
-                                new_job_list_date_parsed = dt_obj.date()
-
-        except Exception as e_script_date:
-            print(f"Error extracting date from data-automation='server-state'"
-                  f" script: {e_script_date}")
-
-        if new_job_list_date_parsed:
-            result_data['job_list_date'] = new_job_list_date_parsed
-            # print(f"Updated job_list_date from script tag:
-            # {new_job_list_date_parsed}")
-
+                page_soup = BeautifulSoup(page_content, 'html.parser')
+                page_details = details_from_page_soup(page_soup)
+                if seek_job is not None:
+                    page_details['job_list_date'] = _listed_date(seek_job)
+            except Exception as e_parse:
+                error_message = str(f"HTML parsing or other error: {e_parse}")
+
+    if page_details is not None:
+        result_data['job_description'] = page_details['job_description']
+        for key in ('industries', 'employment_type', 'job_list_date'):
+            if page_details.get(key):
+                result_data[key] = page_details[key]
         result_data['get_time'] = datetime.now()
 
     else:
@@ -407,4 +463,7 @@ def enrich_jobstreet(job_info_series: pd.Series,
         if col not in final_df.columns:
             final_df[col] = None
 
-    return final_df[FINAL_COLUMN_ORDER]
+    final_df = final_df[FINAL_COLUMN_ORDER]
+    if page_details is not None:
+        store_job(final_df)
+    return final_df
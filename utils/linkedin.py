@@ -1,12 +1,53 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
+import os
 import re
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 import time
-import random
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from utils import fetch_archive, rate_limiter
+from utils.description import html_to_telegram
+from utils.http_session import fetch
+from utils.job_cache import load_cached_job, store_job
+from utils.pagination import MAX_PAGES, crawl_pages
+
+# Parser backend for search results pages: 'lxml' or 'html5lib'.
+LINKEDIN_PARSER = os.environ.get('LINKEDIN_PARSER', 'lxml')
+RESULTS_LIST_STRAINER = SoupStrainer(
+    'ul', attrs={'class': re.compile('results-list')})
+# Seconds to wait after each scroll for LinkedIn to append more cards.
+SCROLL_PAUSE = 3
+# Stop scrolling a search after this many already scraped jobs in a row.
+KNOWN_STREAK_LIMIT = int(os.environ.get('LINKEDIN_KNOWN_STREAK', '25'))
+# Public fragment endpoints that serve the search results and job pages to
+# logged-out visitors. Overridable to point at a local stand-in server.
+LINKEDIN_GUEST_BASE = os.environ.get(
+    'LINKEDIN_GUEST_BASE', 'https://www.linkedin.com/jobs-guest/jobs/api')
+# Cards returned per guest search request; the start offset steps by this.
+GUEST_PAGE_SIZE = 10
+# Query parameters of a /jobs/search URL that select the results.
+GUEST_SEARCH_PARAMS = ('keywords', 'location', 'geoId', 'f_I', 'f_TPR',
+                       'f_E', 'f_JT', 'sortBy')
+GUEST_HEADERS = {
+    'accept': '*/*',
+    'accept-language': 'en-US,en;q=0.9',
+    'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
+                  'AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/134.0.0.0 Safari/537.36',
+}
+# Returns the outerHTML of the result cards from index arguments[0] on.
+NEW_CARDS_SCRIPT = """
+const cards = document.querySelectorAll("ul[class*='results-list'] > li");
+const html = [];
+for (let i = arguments[0]; i < cards.length; i++) {
+    html.push(cards[i].outerHTML);
+}
+return html;
+"""
 
 
 def get_linkedin(all_jobs_page_soup):
@@ -20,9 +61,8 @@ def get_linkedin(all_jobs_page_soup):
                                                  job listing.
 
     Returns:
-        pandas.DataFrame: A DataFrame with a single row containing the
-        extracted job information. Returns a DataFrame with error
-          messages if extraction fails.
+        dict: The extracted job information, one key per column. A field
+        that can't be extracted is None.
     """
     source = "linkedin"
 
@@ -87,104 +127,226 @@ def get_linkedin(all_jobs_page_soup):
     except Exception:
         pass
 
-    try:
-        job_info_df = pd.DataFrame({
-            'source': [source],
-            'job_id': [job_id],
-            'job_url': [job_url],
-            'job_title': [job_title],
-            'job_company': [job_company],
-            'job_location': [job_location],
-            'job_salary': [job_salary],
-            'job_list_date': [job_list_date]
-        })
-        return job_info_df
-    except Exception:
-        return pd.DataFrame({
-            'job_id': ["Error"],
-            'job_url': ["Error"],
-            'job_title': [None],
-            'job_company': [None],
-            'job_location': [None],
-            'job_salary': [None],
-            'job_list_date': [None]
-        })
-
-
-def get_job_from_linkedin_url(url, sb):
-    print(f"Getting job from {url}")
+    return {
+        'source': source,
+        'job_id': job_id,
+        'job_url': job_url,
+        'job_title': job_title,
+        'job_company': job_company,
+        'job_location': job_location,
+        'job_salary': job_salary,
+        'job_list_date': job_list_date
+    }
+
+
+def _stream_linkedin_cards(url, sb):
+    # Yields the outerHTML of the job cards appended by each scroll step.
+    # The next scroll is started before a batch is yielded, so the caller
+    # parses it while the browser loads more cards.
     sb.open(url)
     sb.sleep(2)
-    # last_height = sb.execute_script("return document.body.scrollHeight")
+    card_count = 0
     last_height = 0
 
     while True:
+        cards = sb.execute_script(NEW_CARDS_SCRIPT, card_count)
+        card_count += len(cards)
         sb.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        sb.sleep(3)  # Delay by 3 seconds to allow content to load
-        # print(f":Last Height: {last_height}")
+        scrolled_at = time.monotonic()
+        if cards:
+            yield cards
+        # Wait out the rest of the delay to allow content to load
+        sb.sleep(max(0, SCROLL_PAUSE - (time.monotonic() - scrolled_at)))
         new_height = sb.execute_script("return document.body.scrollHeight")
-        # print(f"New Height: {new_height}")
         if last_height == new_height:
             break
         else:
             last_height = new_height
 
-    page = sb.get_page_source()
-    soup = BeautifulSoup(page, 'html5lib')
+    cards = sb.execute_script(NEW_CARDS_SCRIPT, card_count)
+    if cards:
+        yield cards
+
+
+def parse_linkedin_results(page, parser=LINKEDIN_PARSER):
+    """
+    Parses the job cards out of a LinkedIn search results page.
+
+    Args:
+        page (str): The page source.
+        parser (str): 'lxml' builds only the results list subtree with
+        lxml and a SoupStrainer; 'html5lib' builds the whole document.
+
+    Returns:
+        pandas.DataFrame: One row per job card.
+    """
+    if parser == 'html5lib':
+        soup = BeautifulSoup(page, 'html5lib')
+    else:
+        soup = BeautifulSoup(page, 'lxml', parse_only=RESULTS_LIST_STRAINER)
 
     all_jobs_page = soup.select("ul[class*='results-list'] > li")
 
     job_listings_data = [get_linkedin(job_element)
                          for job_element in all_jobs_page]
-    all_jobs_df = pd.concat(job_listings_data, ignore_index=True)
-    return all_jobs_df
+    return pd.DataFrame(job_listings_data)
 
 
-def enrich_linkedin(job_info_df, driver):
+def get_job_from_linkedin_url(url, sb, parser=LINKEDIN_PARSER,
+                              seen_ids=None,
+                              known_streak_limit=KNOWN_STREAK_LIMIT):
     """
-    Navigates to a LinkedIn job URL, extracts detailed job information,
-    and adds it as new columns to the input DataFrame.
+    Scrolls a LinkedIn search and parses its job cards as they load.
+
+    Each scroll step only pulls the newly appended cards out of the
+    browser, so the full page is never serialized.
 
     Args:
-        job_info_df (pd.DataFrame): A DataFrame containing basic job
-        information for a single job (expected to have one row). driver
-        (selenium.webdriver.remote.webdriver.WebDriver):
-        The Selenium WebDriver instance.
+        url (str): The LinkedIn job search URL.
+        sb (seleniumbase.BaseCase): The browser session.
+        parser (str): Parser backend, see parse_linkedin_results.
+        seen_ids (set, optional): job_ids already scraped, as strings.
+        known_streak_limit (int): Stop scrolling after this many already
+        scraped jobs in a row. Only used with seen_ids.
 
     Returns:
-        pd.DataFrame: The input DataFrame with added columns for
-        detailed job info.
+        pandas.DataFrame: One row per job card.
     """
+    print(f"Getting job from {url}")
+    if fetch_archive.is_replaying():
+        page = fetch_archive.page_source(url, None)
+        return parse_linkedin_results(page, parser=parser)
+
+    recorded_cards = []
+    job_frames = []
+    known_streak = 0
+    for cards in _stream_linkedin_cards(url, sb):
+        if fetch_archive.is_recording():
+            recorded_cards.extend(cards)
+        jobs_df = parse_linkedin_results(
+            "<ul class='jobs-search__results-list'>" + "".join(cards)
+            + "</ul>", parser=parser)
+        job_frames.append(jobs_df)
+
+        if seen_ids is None or jobs_df.empty:
+            continue
+        for job_id in jobs_df['job_id']:
+            known_streak = known_streak + 1 if str(job_id) in seen_ids \
+                else 0
+        if known_streak >= known_streak_limit:
+            print(f"Last {known_streak} jobs were already scraped, "
+                  "stopping.")
+            break
 
-    url = job_info_df['job_url'].iloc[0]
-    job_title = job_info_df['job_title'].iloc[0]
-    job_company = job_info_df['job_company'].iloc[0]
-    print(f"Getting Job Details for {job_title} - {job_company}")
+    if recorded_cards:
+        fetch_archive.record_page(
+            url, "<ul class='jobs-search__results-list'>"
+            + "".join(recorded_cards) + "</ul>")
+    if not job_frames:
+        return pd.DataFrame()
+    return pd.concat(job_frames, ignore_index=True)
 
-    # Initialize new columns with default None values.
-    # This ensures they exist even if extraction fails later.
-    job_info_df['seniority_level'] = None
-    job_info_df['employment_type'] = None
-    job_info_df['industries'] = None
-    job_info_df['job_description'] = None
-    job_info_df['applicant'] = None
-    job_info_df['get_time'] = pd.Timestamp\
-        .now()  # Set initial get_time
 
+def guest_search_url(search_url, start=0):
+    """
+    Converts a LinkedIn /jobs/search URL into a guest search fragment URL.
+
+    Args:
+        search_url (str): A LinkedIn job search URL, as opened in a browser.
+        start (int): Offset of the first result to return.
+
+    Returns:
+        str: The seeMoreJobPostings URL for the same search.
+    """
+    query = parse_qs(urlsplit(search_url).query)
+    params = [(key, value) for key in GUEST_SEARCH_PARAMS
+              for value in query.get(key, [])]
+    params.append(('start', start))
+    return f"{LINKEDIN_GUEST_BASE}/seeMoreJobPostings/search?" \
+        f"{urlencode(params)}"
+
+
+def search_keyword(search_url):
+    """Returns the keywords parameter of a LinkedIn search URL."""
+    query = parse_qs(urlsplit(search_url).query)
+    return query.get('keywords', [search_url])[0]
+
+
+def _get_linkedin_guest_page(url, proxy_string=None,
+                             parser=LINKEDIN_PARSER):
+    print(f"Getting job from {url}")
+    try:
+        response = fetch(url, headers=GUEST_HEADERS,
+                         proxy_string=proxy_string, timeout=20)
+    except Exception as e:
+        print(f"Error fetching {url}: {e}")
+        return None
+    if response.status_code != 200 or not response.text.strip():
+        # Past the last result the endpoint answers 400 or an empty body.
+        print(f"No more results at {url} (status {response.status_code})")
+        return None
+    return parse_linkedin_results(
+        "<ul class='jobs-search__results-list'>" + response.text + "</ul>",
+        parser=parser)
+
+
+def get_job_from_linkedin_guest(url, proxy_string=None, seen_ids=None,
+                                max_pages=MAX_PAGES, parser=LINKEDIN_PARSER):
+    """
+    Lists a LinkedIn search through the guest fragment endpoint, without a
+    browser.
+
+    Pages through the results like scrolling the search page would, and
+    parses the cards with get_linkedin.
+
+    Args:
+        url (str): A LinkedIn job search URL, as opened in a browser.
+        proxy_string (str, optional): Proxy in the form
+        'user:password@host:port'.
+        seen_ids (set, optional): job_ids already scraped, as strings.
+        Paging stops at a page with only these. Without them only the
+        first page is read, like the browser path.
+        max_pages (int): Maximum number of result pages to read.
+        parser (str): Parser backend, see parse_linkedin_results.
+
+    Returns:
+        pandas.DataFrame: One row per job card.
+    """
+    jobs_df = crawl_pages(
+        lambda page: guest_search_url(url, (page - 1) * GUEST_PAGE_SIZE),
+        lambda page_url: _get_linkedin_guest_page(page_url, proxy_string,
+                                                  parser),
+        seen_ids=seen_ids, max_pages=max_pages)
+    if jobs_df.empty:
+        return jobs_df
+    return jobs_df.drop_duplicates(subset='job_id', ignore_index=True)
+
+
+def _load_linkedin_job_page(url, driver):
+    rate_limiter.wait(url)
+    start = time.monotonic()
     try:
         driver.get(url)
     except Exception as e:
         print(f"Failed to get URL {url}: {e}")
-        # job_info_df already has None for new columns and current get_time
-        return job_info_df
+        return None
+    rate_limiter.report(url, latency=time.monotonic() - start,
+                        text=driver.title)
 
-    time.sleep(3)
+    # Wait for the description to render rather than for a fixed time.
+    try:
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located(
+                (By.CSS_SELECTOR,
+                 "div[class*='show-more-less-html__markup']"))
+        )
+    except TimeoutException:
+        print("Job description did not load in time.")
 
     # User added script execution - ensure 'driver' is used
     try:
         driver.execute_script("document.elementFromPoint(10, 10).click();")
         print("Executed click script.")
-        time.sleep(1)
     except Exception as e:
         print(f"Could not execute click script: {e}")
 
@@ -196,92 +358,70 @@ def enrich_linkedin(job_info_df, driver):
         )
         show_more_button.click()
         print("Clicked 'Show more' button for description.")
-        time.sleep(1)  # Wait for description to expand
     except (NoSuchElementException, TimeoutException):
         print("Could not find or click 'Show more' button for description.")
+    else:
+        # The description is expanded once it is no longer clamped.
+        try:
+            WebDriverWait(driver, 5).until(
+                EC.invisibility_of_element_located(
+                    (By.CSS_SELECTOR,
+                     "div[class*='show-more-less-html__markup--clamp']"))
+            )
+        except TimeoutException:
+            print("Description did not expand in time.")
+
+    return driver.page_source
 
-    page_source = driver.page_source
-    soup = BeautifulSoup(page_source, 'html.parser')
 
-    keywords = ["Job ID", "Job Type",
-                "Location", "Categories", "Applications close"]
+def _fetch_linkedin_job_posting(job_id, proxy_string=None):
+    # The guest job posting fragment holds the full description and the
+    # criteria list, so no clicking or waiting is needed.
+    posting_url = f"{LINKEDIN_GUEST_BASE}/jobPosting/{job_id}"
+    try:
+        response = fetch(posting_url, headers=GUEST_HEADERS,
+                         proxy_string=proxy_string, timeout=20)
+    except Exception as e:
+        print(f"Failed to get URL {posting_url}: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"Failed to get URL {posting_url}: "
+              f"status {response.status_code}")
+        return None
+    return response.text
+
+
+def extract_linkedin_details(page_source):
+    """
+    Extracts the detail fields from a LinkedIn job page.
+
+    Works on both the full page loaded in the browser and the guest job
+    posting fragment.
+
+    Args:
+        page_source (str): The job page HTML.
+
+    Returns:
+        dict: 'job_description', 'applicant', 'seniority_level',
+        'employment_type' and 'industries', each None when not found.
+    """
+    details = dict.fromkeys(['job_description', 'applicant',
+                             'seniority_level', 'employment_type',
+                             'industries'])
+    soup = BeautifulSoup(page_source, 'html.parser')
 
-    extracted_job_description = None  # Use a temporary variable for extraction
     try:
         description_element = soup.select_one(
             "div[class*='show-more-less-html__markup']")
         if description_element:
-            extracted_job_description = str(description_element)
-            # Apply cleaning rules
-            extracted_job_description = re.sub(r'[\"\']', "'",
-                                               extracted_job_description)
-            div_wrapper_pattern = (
-                r"<div class='show-more-less-html__markup "
-                r"show-more-less-html__markup--clamp-after-5\s+relative "
-                r"overflow-hidden'>|<div class='show-more-less-html__markup "
-                r"relative overflow-hidden'>"
-            )
-            extracted_job_description = re.sub(
-                div_wrapper_pattern,
-                "",
-                extracted_job_description,
-                flags=re.IGNORECASE
-            )
-
-            extracted_job_description = re.sub(r'[\n\t]+', ' ',
-                                               extracted_job_description)
-            extracted_job_description = re.sub(r'\s{2,}', ' ',
-                                               extracted_job_description)
-            extracted_job_description = re.sub(r"<p><br></p>", "\n\n",
-                                               extracted_job_description,
-                                               flags=re.IGNORECASE)
-            extracted_job_description = re.sub(r"</p>|<br\s*/?>", "\n\n",
-                                               extracted_job_description,
-                                               flags=re.IGNORECASE)
-            extracted_job_description = re.sub(r"</ul>", "\n\n",
-                                               extracted_job_description,
-                                               flags=re.IGNORECASE)
-            extracted_job_description = re.sub(r"</li>", "\n",
-                                               extracted_job_description,
-                                               flags=re.IGNORECASE)
-            extracted_job_description = re.sub(
-                r"<div>|</div>|<ul>|</ol>|<span>|</span>", "",
-                extracted_job_description, flags=re.IGNORECASE)
-            extracted_job_description = re.sub(r"<p>|<ol>", "\n\n",
-                                               extracted_job_description,
-                                               flags=re.IGNORECASE)
-            extracted_job_description = re.sub(r"<li>", "\n • ",
-                                               extracted_job_description,
-                                               flags=re.IGNORECASE)
-            extracted_job_description = re.sub(r"•\s*\n", "• ",
-                                               extracted_job_description)
-            extracted_job_description = re.sub(r"\s+•", " •",
-                                               extracted_job_description)
-            extracted_job_description = re.sub(r"(\n\s*){3,}", "\n\n",
-                                               extracted_job_description)
-            extracted_job_description = re.sub(r"\n\n</strong>\n",
-                                               "\n</strong>\n",
-                                               extracted_job_description,
-                                               flags=re.IGNORECASE)
-
-            if extracted_job_description:
-                for keyword_text in keywords:
-                    escaped_keyword = re.escape(keyword_text)
-                    cur_pattern_str = r"(?<=\b" + escaped_keyword + r"\b)\n\n"
-                    extracted_job_description = re.sub(
-                        cur_pattern_str, "\n", extracted_job_description)
-
-            if extracted_job_description:
-                job_info_df['job_description'] = extracted_job_description\
-                    .strip()
+            details['job_description'] = html_to_telegram(
+                str(description_element), 'linkedin') or None
 
     except Exception as e:
         print(f"An error occurred during job description processing: {e}")
-        # job_description remains None or its last successfully processed state
         pass
 
     # --- Extract other details ---
-    extracted_applicant_count = None
     try:
         applicant_selectors = (
             "figcaption[class*='applicants'], "
@@ -290,19 +430,11 @@ def enrich_linkedin(job_info_df, driver):
         )
         applicant_element = soup.select_one(applicant_selectors)
         if applicant_element:
-            extracted_applicant_count = applicant_element.get_text(strip=True)
-            job_info_df['applicant'] = extracted_applicant_count
+            details['applicant'] = applicant_element.get_text(strip=True)
     except Exception as e:
         print(f"Error extracting applicant count: {e}")
         pass
 
-    # Update get_time to reflect the actual processing time
-    job_info_df['get_time'] = pd.Timestamp.now()
-
-    extracted_seniority_level = None
-    extracted_employment_type = None
-    extracted_industries = None
-
     job_criteria_selectors = (
         "ul[class*='job-criteria__list'] > li.job-criteria__item, "
         "ul[class*='description__job-criteria-list'] > "
@@ -333,20 +465,91 @@ def enrich_linkedin(job_info_df, driver):
                     pass
 
         # Assign from map
-        extracted_seniority_level = criteria_map.get("seniority level")
-        extracted_employment_type = criteria_map.get("employment type")
-        extracted_industries = criteria_map.get("industries") or criteria_map.\
-            get("job function")
-
-        if extracted_seniority_level:
-            job_info_df['seniority_level'] = extracted_seniority_level
-        if extracted_employment_type:
-            job_info_df['employment_type'] = extracted_employment_type
-        if extracted_industries:
-            job_info_df['industries'] = extracted_industries
+        details['seniority_level'] = criteria_map.get("seniority level")
+        details['employment_type'] = criteria_map.get("employment type")
+        details['industries'] = criteria_map.get("industries") or \
+            criteria_map.get("job function")
     else:
         print("Job criteria elements not found or structure not recognized.")
 
-    time.sleep(random.uniform(1, 3))
+    return details
+
+
+def enrich_linkedin(job_info_df, driver=None, proxy_string=None):
+    """
+    Fetches a LinkedIn job's page, extracts detailed job information,
+    and adds it as new columns to the input DataFrame.
+
+    Args:
+        job_info_df (pd.DataFrame): A DataFrame containing basic job
+        information for a single job (expected to have one row).
+        driver (selenium.webdriver.remote.webdriver.WebDriver, optional):
+        The Selenium WebDriver instance. Without it the guest job posting
+        fragment is fetched over HTTP instead.
+        proxy_string (str, optional): Proxy for the HTTP fetch, in the form
+        'user:password@host:port'.
+
+    Returns:
+        pd.DataFrame: The input DataFrame with added columns for
+        detailed job info.
+    """
+
+    cached_job = load_cached_job('linkedin', job_info_df['job_id'].iloc[0])
+    if cached_job is not None:
+        return cached_job
 
+    url = job_info_df['job_url'].iloc[0]
+    job_title = job_info_df['job_title'].iloc[0]
+    job_company = job_info_df['job_company'].iloc[0]
+    print(f"Getting Job Details for {job_title} - {job_company}")
+
+    # Initialize new columns with default None values.
+    # This ensures they exist even if extraction fails later.
+    job_info_df['seniority_level'] = None
+    job_info_df['employment_type'] = None
+    job_info_df['industries'] = None
+    job_info_df['job_description'] = None
+    job_info_df['applicant'] = None
+    job_info_df['get_time'] = pd.Timestamp\
+        .now()  # Set initial get_time
+
+    if driver is None:
+        page_source = _fetch_linkedin_job_posting(
+            job_info_df['job_id'].iloc[0], proxy_string)
+    else:
+        page_source = fetch_archive.page_source(
+            url, lambda: _load_linkedin_job_page(url, driver))
+    if page_source is None:
+        # job_info_df already has None for new columns and current get_time
+        return job_info_df
+
+    details = extract_linkedin_details(page_source)
+    for column, value in details.items():
+        if value:
+            job_info_df[column] = value
+
+    # Update get_time to reflect the actual processing time
+    job_info_df['get_time'] = pd.Timestamp.now()
+
+    # Authwall, challenge and blank pages yield no description. Those are
+    # not cached, so the job is fetched again on the next run.
+    if details.get('job_description'):
+        store_job(job_info_df)
     return job_info_df
+
+
+def enrich_linkedin_guest(job_info_series, proxy_string=None):
+    """
+    Enriches one job over HTTP, for use with
+    utils.concurrency.enrich_concurrently.
+
+    Args:
+        job_info_series (pd.Series): The job's listing row.
+        proxy_string (str, optional): Proxy in the form
+        'user:password@host:port'.
+
+    Returns:
+        pd.DataFrame: A single-row DataFrame with the enriched job.
+    """
+    return enrich_linkedin(job_info_series.to_frame().T,
+                           proxy_string=proxy_string)
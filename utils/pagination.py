@@ -0,0 +1,51 @@
+import pandas as pd
+
+# Safety cap on how deep a single listing is crawled.
+MAX_PAGES = 10
+
+
+def crawl_pages(page_url, fetch_page, seen_ids=None, max_pages=MAX_PAGES):
+    """
+    Walks the pages of a listing until it stops yielding new jobs.
+
+    Page 1 is always fetched. Later pages are only fetched while the
+    previous page still had at least one job_id not in seen_ids, so a run
+    with nothing new costs a single request while a run after an outage
+    keeps going until it reaches jobs that were already scraped.
+
+    Args:
+        page_url (callable): Returns the URL of a 1-based page number.
+        fetch_page (callable): Fetches and parses one page URL, returning a
+        DataFrame with a 'job_id' column, or None/empty when the page has
+        no jobs or did not answer with a 2xx status. Either ends the crawl.
+        seen_ids (set, optional): job_ids already in the dedupe store, as
+        strings. If None, only the first page is fetched.
+        max_pages (int): Maximum number of pages to fetch.
+
+    Returns:
+        pandas.DataFrame: The jobs from every fetched page.
+    """
+    frames = []
+    crawled_ids = set()
+    for page_number in range(1, max_pages + 1):
+        jobs = fetch_page(page_url(page_number))
+        if not isinstance(jobs, pd.DataFrame) or jobs.empty:
+            break
+
+        page_ids = set(jobs['job_id'].dropna().astype(str))
+        if page_ids <= crawled_ids:
+            # Past the last page some sites repeat the final page.
+            break
+        crawled_ids |= page_ids
+        frames.append(jobs)
+
+        if seen_ids is None:
+            break
+        if page_ids <= seen_ids:
+            print(f"Page {page_number} only has already scraped jobs, "
+                  "stopping.")
+            break
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -1,9 +1,32 @@
 import pandas as pd
 from bs4 import BeautifulSoup
-import re
-import cloudscraper
 from datetime import datetime
-import time
+
+from utils.description import html_to_telegram
+from utils.gazetteer import compile_gazetteer, infer_location
+from utils.http_session import fetch
+from utils.http_cache import fetch_listing, save_listing
+from utils.job_cache import load_cached_job, store_job
+from utils.pagination import MAX_PAGES, crawl_pages
+
+
+# Predefined list of Indonesian locations from the R script
+INDONESIAN_LOCATIONS = [
+    "Aceh", "Sumatera Utara", "Sumatera Barat", "Riau", "Jambi",
+    "Sumatera Selatan", "Bengkulu", "Lampung", "Kepulauan Bangka Belitung",
+    "Kepulauan Riau", "Jakarta", "Jawa Barat", "Jawa Tengah",
+    "Yogyakarta", "Jawa Timur", "Banten", "Bali",
+    "Nusa Tenggara Barat", "Nusa Tenggara Timur", "Kalimantan Barat",
+    "Kalimantan Tengah",
+    "Kalimantan Selatan", "Kalimantan Timur", "Kalimantan Utara",
+    "Sulawesi Utara", "Sulawesi Tengah", "Sulawesi Selatan",
+    "Sulawesi Tenggara",
+    "Gorontalo", "Sulawesi Barat", "Maluku", "Maluku Utara", "Papua Barat",
+    "Papua", "Pontianak", "Banjarmasin", "Samarinda", "Balikpapan",
+    "Palangkaraya",
+    "Banjarbaru", "Tarakan", "Sanggau"
+]
+LOCATION_GAZETTEER = compile_gazetteer(INDONESIAN_LOCATIONS)
 
 
 def parse_petromindo(job_card_soup: BeautifulSoup, industries: str):
@@ -18,8 +41,7 @@ def parse_petromindo(job_card_soup: BeautifulSoup, industries: str):
         industries (str): The industries string to associate with this job.
 
     Returns:
-        pandas.DataFrame: A single-row DataFrame containing extracted job
-        information.
+        dict: The extracted job information, one key per column.
     """
     source = "petromindo"
     job_id = None
@@ -111,11 +133,10 @@ def parse_petromindo(job_card_soup: BeautifulSoup, industries: str):
         'industries': industries
     }
 
-    return pd.DataFrame([job_data])
+    return job_data
 
 
-def get_job_from_petromindo_url(url, industry,
-                                proxy_string=None):
+def _get_petromindo_page(url, industry, proxy_string=None):
     print(f'Getting job from {url}')
 
     headers = {
@@ -141,41 +162,176 @@ def get_job_from_petromindo_url(url, industry,
         # 'cookie': 'ar_debug=1',
     }
 
-    proxies_dict = None
-    if proxy_string:
-        proxies_dict = {
-            'http': proxy_string,
-            'https': proxy_string  # Assuming the same proxy for http and https
-        }
-
-    scraper = cloudscraper.create_scraper()
-    response = scraper.get(
-        url=url,
-        # cookies=cookies,
-        headers=headers,
-        proxies=proxies_dict
-    )
+    response, cached_jobs = fetch_listing(url, headers=headers,
+                                          proxy_string=proxy_string)
+    if cached_jobs is not None:
+        return cached_jobs
+    if not 200 <= response.status_code < 300:
+        # Error pages, like the 404 past the last page, have no jobs.
+        print(f"No more results at {url} (status {response.status_code})")
+        return None
 
     soup = BeautifulSoup(response.text, 'html.parser')
 
     job_cards = soup.select("article")
 
-    all_jobs_df = []
     print(f"Found {len(job_cards)} job cards on the first page.")
     try:
-        all_jobs_df = pd.concat([
+        all_jobs_df = pd.DataFrame([
             parse_petromindo(
                 job_card_soup=job_card, industries="oil-gas")
             for job_card in job_cards
         ])
         print("All Jobs Df:")
         print(all_jobs_df)
+        save_listing(url, response, all_jobs_df)
         return all_jobs_df
     except Exception as e:
         print("Error", e)
         return None
 
 
+def get_job_from_petromindo_url(url, industry, proxy_string=None,
+                                seen_ids=None, max_pages=MAX_PAGES):
+    """
+    Gets the jobs of a Petromindo job-gallery category, following its
+    /page/N/ pagination.
+
+    Args:
+        url (str): The category URL, e.g.
+        'https://www.petromindo.com/job-gallery/category/oil-gas/'.
+        industry (str): The category the jobs belong to.
+        proxy_string (str, optional): Proxy in the form
+        'user:password@host:port'.
+        seen_ids (set, optional): Already scraped job_ids. Crawling stops at
+        the first page made up only of these. If None, only the first page
+        is read.
+        max_pages (int): Maximum number of pages to read.
+
+    Returns:
+        pandas.DataFrame: The jobs found on all pages read.
+    """
+    base_url = url.rstrip('/')
+    return crawl_pages(
+        lambda page: url if page == 1 else f"{base_url}/page/{page}/",
+        lambda page_url: _get_petromindo_page(page_url, industry,
+                                              proxy_string),
+        seen_ids=seen_ids, max_pages=max_pages)
+
+
+def extract_petromindo_details(page_soup):
+    """
+    Reads the enrichable fields from a Petromindo job page.
+
+    Args:
+        page_soup (BeautifulSoup): The parsed job page.
+
+    Returns:
+        dict: 'job_location', 'job_list_date' and 'job_description', each
+        None when missing.
+    """
+    details = {'job_location': None, 'job_list_date': None,
+               'job_description': None}
+
+    # --- Job Location ---
+    desc_text_for_location = None
+    try:
+        location_desc_container = page_soup\
+            .select_one(
+                "div[class*='col-12'][class*='col-md-8'] > article > div")
+        if location_desc_container:
+            desc_text_for_location = location_desc_container.get_text(
+                separator=" ", strip=True)
+    except Exception as e_loc_text:
+        print(f"Error extracting text for location analysis: {e_loc_text}")
+
+    if not (desc_text_for_location is None or
+            (isinstance(desc_text_for_location, float) and
+             pd.isna(desc_text_for_location)) or
+            (isinstance(desc_text_for_location, str) and
+             not desc_text_for_location.strip()) or
+            (isinstance(desc_text_for_location, list) and
+             not desc_text_for_location)):
+        details['job_location'] = infer_location(
+            desc_text_for_location, LOCATION_GAZETTEER)
+    else:
+        details['job_location'] = None
+
+    # --- Job List Date ---
+    try:
+        date_span_element = page_soup.select_one(
+            "header[class*='header'] > p > span")
+        if date_span_element:
+            date_text_raw = date_span_element.get_text(strip=True)
+            if ": " in date_text_raw:
+                date_str_to_parse = date_text_raw.split(": ", 1)[1]
+                try:
+                    parsed_date_obj = datetime.strptime(
+                        date_str_to_parse, '%B %d, %Y').date()
+                    details['job_list_date'] = parsed_date_obj
+                except ValueError as ve:
+                    print(f"Could not parse date string "
+                          f"'{date_str_to_parse}' with mdy format: {ve}")
+                    pass
+    except Exception as e_date:
+        print(f"Error extracting job_list_date: {e_date}")
+
+    job_list_date_val = details.get('job_list_date')
+    if job_list_date_val is None or \
+       (isinstance(job_list_date_val, float) and
+        pd.isna(job_list_date_val)) or \
+       (isinstance(job_list_date_val, str) and
+        not job_list_date_val.strip()) or \
+       (isinstance(job_list_date_val, list) and not job_list_date_val):
+        details['job_list_date'] = None
+
+    # --- Job Description ---
+    description_raw_container = None
+    try:
+        selector_desc_container = "div[class*='container'] > "\
+            "div[class*='row'] > div > article > div"
+        description_raw_container = page_soup.select_one(
+            selector_desc_container)
+    except Exception as e_desc_container:
+        print(f"Error selecting description_raw_container:"
+              f"{e_desc_container}")
+
+    if description_raw_container:
+        try:
+            p_tags = description_raw_container.find_all("p")
+            full_desc_html_from_p = "".join([str(p) for p in p_tags]) \
+                if p_tags else ""
+
+            if not full_desc_html_from_p and description_raw_container:
+                print("No <p> tags found in description container, "
+                      "using full container HTML for description.")
+                full_desc_html_from_p = str(description_raw_container)
+
+            desc_text = html_to_telegram(full_desc_html_from_p,
+                                         'petromindo')
+            desc_text = desc_text or None
+
+            if desc_text and len(desc_text) > 5000:
+                desc_text = desc_text[:5000]
+
+            details['job_description'] = desc_text
+
+        except Exception as e_desc_clean:
+            print(f"Error cleaning Petromindo description: {e_desc_clean}")
+
+    job_description_val = details.get('job_description')
+
+    if job_description_val is None or \
+       (isinstance(job_description_val, float) and
+        pd.isna(job_description_val)) or \
+       (isinstance(job_description_val, str) and
+        not job_description_val.strip()) or \
+       (isinstance(job_description_val, list) and not job_description_val):
+        details['job_description'] = None
+
+    return details
+
+
 def enrich_petromindo(job_info_series: pd.Series, proxy_string):
     """
     Enriches a single job's information by visiting its Petromindo page.
@@ -196,23 +352,10 @@ def enrich_petromindo(job_info_series: pd.Series, proxy_string):
         "get_time"
     ]
 
-    # Predefined list of Indonesian locations from the R script
-    INDONESIAN_LOCATIONS = [
-        "Aceh", "Sumatera Utara", "Sumatera Barat", "Riau", "Jambi",
-        "Sumatera Selatan", "Bengkulu", "Lampung", "Kepulauan Bangka Belitung",
-        "Kepulauan Riau", "Jakarta", "Jawa Barat", "Jawa Tengah",
-        "Yogyakarta", "Jawa Timur", "Banten", "Bali ",
-        "Nusa Tenggara Barat", "Nusa Tenggara Timur", "Kalimantan Barat",
-        "Kalimantan Tengah",
-        "Kalimantan Selatan", "Kalimantan Timur", "Kalimantan Utara",
-        "Sulawesi Utara", "Sulawesi Tengah", "Sulawesi Selatan",
-        "Sulawesi Tenggara",
-        "Gorontalo", "Sulawesi Barat", "Maluku", "Maluku Utara", "Papua Barat",
-        "Papua", "Pontianak", "Banjarmasin", "Samarinda", "Balikpapan",
-        "Palangkaraya",
-        "Banjarbaru", "Tarakan", "Sanggau"
-    ]
-    # Normalize the locations for Python (e.g., strip trailing spaces)
+    cached_job = load_cached_job('petromindo', job_info_series.get('job_id'),
+                                 FINAL_COLUMN_ORDER)
+    if cached_job is not None:
+        return cached_job
 
     headers = {
         'accept': '*/*',
@@ -237,12 +380,6 @@ def enrich_petromindo(job_info_series: pd.Series, proxy_string):
         # 'cookie': 'ar_debug=1',
     }
 
-    proxies_dict = None
-    if proxy_string:
-        proxies_dict = {
-            'http': proxy_string,
-            'https': proxy_string  # Assuming the same proxy for http and https
-        }
     result_data = {col: job_info_series.get(col) for col in FINAL_COLUMN_ORDER}
     result_data.update(job_info_series.to_dict())
 
@@ -270,15 +407,11 @@ def enrich_petromindo(job_info_series: pd.Series, proxy_string):
             result_data.setdefault(col, None)
         return pd.DataFrame([result_data])[FINAL_COLUMN_ORDER]
 
-    time.sleep(1)
-
     page_soup = None
     error_message_http = None
-    scraper = cloudscraper.create_scraper()
     try:
-        response = scraper.get(url, headers=headers,
-                               proxies=proxies_dict,
-                               timeout=15)
+        response = fetch(url, headers=headers,
+                         proxy_string=proxy_string, timeout=15)
         response.raise_for_status()
         page_soup = BeautifulSoup(response.content, 'html.parser')
     except Exception as e:
@@ -286,152 +419,7 @@ def enrich_petromindo(job_info_series: pd.Series, proxy_string):
         print(f"Error fetching page {url}: {e}")
 
     if page_soup:
-        # --- Job Location ---
-        desc_text_for_location = None
-        try:
-            location_desc_container = page_soup\
-                .select_one(
-                    "div[class*='col-12'][class*='col-md-8'] > article > div")
-            if location_desc_container:
-                desc_text_for_location = location_desc_container.get_text(
-                    separator=" ", strip=True)
-        except Exception as e_loc_text:
-            print(f"Error extracting text for location analysis: {e_loc_text}")
-
-        if not (desc_text_for_location is None or
-                (isinstance(desc_text_for_location, float) and
-                 pd.isna(desc_text_for_location)) or
-                (isinstance(desc_text_for_location, str) and
-                 not desc_text_for_location.strip()) or
-                (isinstance(desc_text_for_location, list) and
-                 not desc_text_for_location)):
-            location_counts = {loc: desc_text_for_location.lower()
-                               .count(loc.lower())
-                               for loc in INDONESIAN_LOCATIONS}
-
-            max_count = 0
-            if location_counts:
-                max_count = max(location_counts.values())
-
-            if max_count > 0:
-                max_locations = [loc for loc, count in location_counts.items()
-                                 if count == max_count]
-                if len(max_locations) == 1:
-                    result_data['job_location'] = " ".join(max_locations[0]
-                                                           .split()).strip()
-                else:
-                    print(f"Multiple locations found with max count "
-                          f"({max_count}): {max_locations}."
-                          f"Setting location to None.")
-                    result_data['job_location'] = None
-            else:
-                result_data['job_location'] = None
-        else:
-            result_data['job_location'] = None
-
-        # --- Job List Date ---
-        try:
-            date_span_element = page_soup.select_one(
-                "header[class*='header'] > p > span")
-            if date_span_element:
-                date_text_raw = date_span_element.get_text(strip=True)
-                if ": " in date_text_raw:
-                    date_str_to_parse = date_text_raw.split(": ", 1)[1]
-                    try:
-                        parsed_date_obj = datetime.strptime(
-                            date_str_to_parse, '%B %d, %Y').date()
-                        result_data['job_list_date'] = parsed_date_obj
-                    except ValueError as ve:
-                        print(f"Could not parse date string "
-                              f"'{date_str_to_parse}' with mdy format: {ve}")
-                        pass
-        except Exception as e_date:
-            print(f"Error extracting job_list_date: {e_date}")
-
-        job_list_date_val = result_data.get('job_list_date')
-        if job_list_date_val is None or \
-           (isinstance(job_list_date_val, float) and
-            pd.isna(job_list_date_val)) or \
-           (isinstance(job_list_date_val, str) and
-            not job_list_date_val.strip()) or \
-           (isinstance(job_list_date_val, list) and not job_list_date_val):
-            result_data['job_list_date'] = None
-
-        # --- Job Description ---
-        description_raw_container = None
-        try:
-            selector_desc_container = "div[class*='container'] > "\
-                "div[class*='row'] > div > article > div"
-            description_raw_container = page_soup.select_one(
-                selector_desc_container)
-        except Exception as e_desc_container:
-            print(f"Error selecting description_raw_container:"
-                  f"{e_desc_container}")
-
-        if description_raw_container:
-            try:
-                p_tags = description_raw_container.find_all("p")
-                full_desc_html_from_p = "".join([str(p) for p in p_tags]) \
-                    if p_tags else ""
-
-                if not full_desc_html_from_p and description_raw_container:
-                    print("No <p> tags found in description container, "
-                          "using full container HTML for description.")
-                    full_desc_html_from_p = str(description_raw_container)
-
-                desc_text = full_desc_html_from_p
-                desc_text = re.sub(r'\n|\t', '', desc_text)
-                desc_text = re.sub(r'\"', "'", desc_text)
-                desc_text = " ".join(desc_text.split()).strip()
-                desc_text = re.sub(r"<p><br\s*/?></p>", "\n\n", desc_text,
-                                   flags=re.IGNORECASE)
-                desc_text = re.sub(r"</ul\s*>", "\n\n", desc_text,
-                                   flags=re.IGNORECASE)
-                desc_text = re.sub(r"<h[1-9][^>]*>", "<strong>", desc_text,
-                                   flags=re.IGNORECASE)
-                desc_text = re.sub(r"</h[1-9]>", "</strong>", desc_text,
-                                   flags=re.IGNORECASE)
-
-                tags_to_remove_pattern = (
-                    r"<div[^>]*>|<div>|</div>|<ul[^>]*>|<ul>|</li>|</p>|"
-                    r"</ol>|<br\s*/?>|<span[^>]*>|<span>|</span>"
-                )
-                desc_text = re.sub(tags_to_remove_pattern, "", desc_text,
-                                   flags=re.IGNORECASE)
-
-                desc_text = re.sub(r"<p[^>]*>|<ol>", "\n\n", desc_text,
-                                   flags=re.IGNORECASE)
-                desc_text = re.sub(r"<li[^>]*>", "\n • ", desc_text,
-                                   flags=re.IGNORECASE)
-                desc_text = re.sub(r"\n\s+\n", "\n\n", desc_text)
-                desc_text = re.sub(r"\n\n<strong>\n\n", "<strong>\n\n",
-                                   desc_text, flags=re.IGNORECASE)
-                desc_text = re.sub(r"•\s*\n(\s*\n)?", "• ", desc_text)
-                desc_text = re.sub(r"\s+•", " •", desc_text)
-                desc_text = re.sub(r"(\n\s*){2,}", "\n\n", desc_text)
-                desc_text = re.sub(r"\n\n</strong>\n", "\n</strong>\n",
-                                   desc_text, flags=re.IGNORECASE)
-
-                desc_text = desc_text.strip() if \
-                    desc_text and desc_text.strip() else None
-
-                if desc_text and len(desc_text) > 5000:
-                    desc_text = desc_text[:5000]
-
-                result_data['job_description'] = desc_text
-
-            except Exception as e_desc_clean:
-                print(f"Error cleaning Petromindo description: {e_desc_clean}")
-
-        job_description_val = result_data.get('job_description')
-
-        if job_description_val is None or \
-           (isinstance(job_description_val, float) and
-            pd.isna(job_description_val)) or \
-           (isinstance(job_description_val, str) and
-            not job_description_val.strip()) or \
-           (isinstance(job_description_val, list) and not job_description_val):
-            result_data['job_description'] = None
+        result_data.update(extract_petromindo_details(page_soup))
 
         result_data['get_time'] = datetime.now()
 
@@ -450,4 +438,7 @@ def enrich_petromindo(job_info_series: pd.Series, proxy_string):
         if col not in final_df.columns:
             final_df[col] = None
 
-    return final_df[FINAL_COLUMN_ORDER]
+    final_df = final_df[FINAL_COLUMN_ORDER]
+    if page_soup:
+        store_job(final_df)
+    return final_df
@@ -0,0 +1,181 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+# Requests per second each domain starts at, and the range it may adapt in.
+INITIAL_RATE = 1.0
+MIN_RATE = 0.2
+MAX_RATE = 5.0
+# Number of requests that may be sent back to back after an idle period.
+BURST = 2
+# Rate gained after every healthy response.
+RATE_STEP = 0.1
+# Rate multipliers applied on a latency spike, server error or failed
+# request, and on a block.
+SLOWDOWN_FACTOR = 0.75
+BACKOFF_FACTOR = 0.5
+# A response slower than this multiple of the average counts as a spike.
+LATENCY_SPIKE_FACTOR = 3.0
+# Pause before the next request after a block without Retry-After.
+BACKOFF_SECONDS = 10.0
+
+CHALLENGE_MARKERS = ("cf-chl", "challenge-platform", "Just a moment...",
+                     "Attention Required! | Cloudflare")
+
+
+def is_blocked(status_code=None, text=None):
+    """
+    Checks whether a response is a rate limit or an anti-bot challenge.
+
+    Args:
+        status_code (int, optional): The HTTP status code, if known.
+        text (str, optional): The response body or page source.
+
+    Returns:
+        bool: True for a 429, or a challenge page.
+    """
+    if status_code == 429:
+        return True
+    if status_code not in (None, 403, 503) or not text:
+        return False
+    return any(marker in text for marker in CHALLENGE_MARKERS)
+
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket whose refill rate adapts to how the site responds.
+
+    Every healthy response raises the rate by RATE_STEP up to MAX_RATE. A
+    latency spike, a 5xx, a timeout or a connection error lowers it by
+    SLOWDOWN_FACTOR, and a 429 or challenge page halves it and pauses the
+    bucket for Retry-After seconds (or BACKOFF_SECONDS).
+    """
+
+    def __init__(self, rate=INITIAL_RATE, min_rate=MIN_RATE,
+                 max_rate=MAX_RATE, burst=BURST):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._avg_latency = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now,
+                           (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_success(self, latency=None):
+        """Speeds up after a healthy response, or slows on a latency spike."""
+        with self._lock:
+            if latency is not None and self._avg_latency is not None and \
+                    latency > LATENCY_SPIKE_FACTOR * self._avg_latency:
+                self.rate = max(self.min_rate, self.rate * SLOWDOWN_FACTOR)
+            else:
+                self.rate = min(self.max_rate, self.rate + RATE_STEP)
+
+            if latency is not None:
+                if self._avg_latency is None:
+                    self._avg_latency = latency
+                else:
+                    self._avg_latency = 0.8 * self._avg_latency \
+                        + 0.2 * latency
+
+    def on_overload(self):
+        """Slows down after a 5xx, a timeout or a connection error."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * SLOWDOWN_FACTOR)
+
+    def on_blocked(self, retry_after=None):
+        """Backs off after a 429 or a challenge page."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+            self._tokens = 0.0
+            pause = retry_after if retry_after is not None \
+                else BACKOFF_SECONDS
+            self._paused_until = max(self._paused_until,
+                                     time.monotonic() + pause)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(url):
+    """
+    Returns the token bucket shared by every request to a URL's domain.
+
+    Args:
+        url (str): Any URL on the target domain.
+
+    Returns:
+        AdaptiveTokenBucket: The bucket for that domain.
+    """
+    domain = urlparse(url).netloc
+    with _buckets_lock:
+        bucket = _buckets.get(domain)
+        if bucket is None:
+            bucket = AdaptiveTokenBucket()
+            _buckets[domain] = bucket
+    return bucket
+
+
+def wait(url):
+    """Blocks until the domain of a URL allows another request."""
+    get_bucket(url).acquire()
+
+
+def report(url, status_code=None, latency=None, text=None,
+           retry_after=None):
+    """
+    Feeds the outcome of a request back into the domain's bucket.
+
+    Args:
+        url (str): The requested URL.
+        status_code (int, optional): The HTTP status code, if known.
+        latency (float, optional): Response time in seconds.
+        text (str, optional): The response body, used to spot challenge
+        pages.
+        retry_after (str or float, optional): The Retry-After header.
+    """
+    bucket = get_bucket(url)
+    if is_blocked(status_code, text):
+        try:
+            retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            retry_after = None
+        print(f"Blocked on {urlparse(url).netloc}, backing off.")
+        bucket.on_blocked(retry_after)
+    elif status_code is not None and status_code >= 500:
+        bucket.on_overload()
+    elif status_code is None or status_code < 400 or status_code == 404:
+        # A 404 is a removed job, not a sign of load. Other 4xx responses
+        # leave the rate as it is.
+        bucket.on_success(latency)
+
+
+def report_failure(url):
+    """
+    Slows a domain down after a request to it timed out or could not
+    connect.
+
+    Args:
+        url (str): The requested URL.
+    """
+    get_bucket(url).on_overload()
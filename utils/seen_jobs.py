@@ -0,0 +1,256 @@
+from datetime import date, datetime, timedelta
+from numbers import Real
+import os
+import sqlite3
+
+import pandas as pd
+
+from utils.fingerprint import job_fingerprint, location_bucket
+from utils.gsheet_utils import normalize_job_id, read_job_columns
+from utils.http_cache import CACHE_DIR
+from utils.seen_keys import add_seen_keys, has_seen_keys, rewrite_seen_keys
+
+SEEN_JOBS_PATH = os.path.join(CACHE_DIR, 'seen_jobs.sqlite')
+# Bumped when the sync reads more columns, so every sheet is read again.
+SCHEMA_VERSION = 3
+SYNC_COLUMNS = ['source', 'job_id', 'job_title', 'job_company',
+                'job_location', 'get_time']
+# How long a job found on one source blocks the same title and company on
+# the others. Companies re-advertise vacancies, so this is not forever.
+CROSS_POST_DAYS = int(os.environ.get('CROSS_POST_DAYS', '30'))
+# Day 0 of the serial numbers Sheets uses for dates.
+SHEETS_EPOCH = datetime(1899, 12, 30)
+
+
+def _connect():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(SEEN_JOBS_PATH, timeout=30)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        # The other tables are rebuilt by reading every sheet again.
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS synced_sheets")
+            conn.execute("DROP TABLE IF EXISTS job_fingerprints")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS seen_jobs ("
+        " sheet TEXT NOT NULL,"
+        " source TEXT NOT NULL,"
+        " job_id TEXT NOT NULL,"
+        " PRIMARY KEY (sheet, source, job_id)) WITHOUT ROWID"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS synced_sheets ("
+        " sheet TEXT PRIMARY KEY,"
+        " last_row INTEGER NOT NULL,"
+        " last_source TEXT,"
+        " last_job_id TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS job_fingerprints ("
+        " fingerprint TEXT NOT NULL,"
+        " sheet TEXT NOT NULL,"
+        " source TEXT NOT NULL,"
+        " job_id TEXT NOT NULL,"
+        " province TEXT,"
+        " scraped_on TEXT,"
+        " PRIMARY KEY (fingerprint, sheet, source, job_id)) WITHOUT ROWID"
+    )
+    return conn
+
+
+def _scrape_date(get_time):
+    # get_time is read unformatted: a serial day number when Sheets parsed
+    # the timestamp, or the text as written otherwise.
+    if isinstance(get_time, Real) and not isinstance(get_time, bool):
+        return (SHEETS_EPOCH + timedelta(days=get_time)).date().isoformat()
+    scraped_at = pd.to_datetime(get_time, errors='coerce')
+    return None if pd.isna(scraped_at) else scraped_at.date().isoformat()
+
+
+def _row_key(row):
+    # The (source, job_id) of a sheet row, or (None, None) if it has none.
+    source, job_id = row[0], row[1]
+    if source == '' or job_id == '':
+        return None, None
+    return str(source), normalize_job_id(job_id)
+
+
+def _index_rows(rows, sheet_name):
+    # Returns the (source, job_id) keys and the fingerprint rows of the
+    # sheet rows.
+    keys = []
+    fingerprints = []
+    for row in rows:
+        key = _row_key(row)
+        if key[0] is None:
+            continue
+        keys.append(key)
+        _, _, title, company, location, get_time = row
+        fingerprint = job_fingerprint(title, company)
+        if fingerprint is not None:
+            fingerprints.append((fingerprint, sheet_name) + key +
+                                (location_bucket(location),
+                                 _scrape_date(get_time)))
+    return keys, fingerprints
+
+
+def sync_seen_jobs(spreadsheet, sheet_name='Geosains Job'):
+    """
+    Copies the rows appended to a worksheet since the last sync into the
+    local index.
+
+    The sheet is only ever appended to, so only the rows from the last one
+    synced are downloaded. That row must still hold the job it held then;
+    if rows above it were deleted, the index of that sheet is rebuilt from
+    scratch.
+
+    Args:
+        spreadsheet (gspread.Spreadsheet): The opened spreadsheet.
+        sheet_name (str): The worksheet holding previously scraped jobs.
+
+    Returns:
+        int: The number of rows read from the sheet.
+    """
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT last_row, last_source, last_job_id FROM synced_sheets"
+            " WHERE sheet = ?", (sheet_name,)).fetchone()
+        synced_row, synced_key = (row[0], row[1:]) if row else (1, None)
+        rebuilt = False
+
+        rows = []
+        last_row = synced_row
+        if synced_row > 1:
+            rows, last_row = read_job_columns(
+                spreadsheet, sheet_name, SYNC_COLUMNS, start_row=synced_row)
+            if rows and last_row >= synced_row and \
+                    _row_key(rows[0]) == synced_key:
+                rows = rows[1:]
+            else:
+                print(f"'{sheet_name}' changed above row {synced_row}, "
+                      "rebuilding the seen jobs index.")
+                with conn:
+                    conn.execute("DELETE FROM seen_jobs WHERE sheet = ?",
+                                 (sheet_name,))
+                    conn.execute(
+                        "DELETE FROM job_fingerprints WHERE sheet = ?",
+                        (sheet_name,))
+                synced_row = 1
+                rebuilt = True
+        if synced_row == 1:
+            rows, last_row = read_job_columns(spreadsheet, sheet_name,
+                                              SYNC_COLUMNS)
+        last_key = _row_key(rows[-1]) if rows else synced_key
+        keys, fingerprints = _index_rows(rows, sheet_name)
+
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO seen_jobs (sheet, source, job_id)"
+                " VALUES (?, ?, ?)",
+                [(sheet_name, source, job_id) for source, job_id in keys])
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_fingerprints"
+                " (fingerprint, sheet, source, job_id, province,"
+                " scraped_on) VALUES (?, ?, ?, ?, ?, ?)", fingerprints)
+            conn.execute(
+                "INSERT OR REPLACE INTO synced_sheets"
+                " (sheet, last_row, last_source, last_job_id)"
+                " VALUES (?, ?, ?, ?)",
+                (sheet_name, last_row) + tuple(last_key or (None, None)))
+
+        # The key file mirrors every sheet in the index. It can only be
+        # appended to, so it is written again when jobs were dropped.
+        if rebuilt or not has_seen_keys():
+            rewrite_seen_keys(conn.execute(
+                "SELECT source, job_id FROM seen_jobs").fetchall())
+        else:
+            add_seen_keys(keys)
+    finally:
+        conn.close()
+
+    print(f"Synced {last_row - synced_row} new rows of '{sheet_name}'.")
+    return last_row - synced_row
+
+
+def get_seen_job_ids(spreadsheet, source, sheet_name='Geosains Job'):
+    """
+    Syncs the local index and returns the job_ids of one source in it.
+
+    Args:
+        spreadsheet (gspread.Spreadsheet): The opened spreadsheet.
+        source (str): The job source, e.g. 'jobstreet'.
+        sheet_name (str): The worksheet holding previously scraped jobs.
+
+    Returns:
+        set: The job_ids as strings.
+    """
+    sync_seen_jobs(spreadsheet, sheet_name)
+
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT job_id FROM seen_jobs WHERE sheet = ? AND source = ?",
+            (sheet_name, source)).fetchall()
+    finally:
+        conn.close()
+    return {job_id for job_id, in rows}
+
+
+def drop_cross_posted(jobs_df, use_location=True,
+                      max_age_days=CROSS_POST_DAYS):
+    """
+    Drops jobs that were recently scraped from another source.
+
+    A job counts as cross-posted when another source has a job with the
+    same normalized title and company, scraped in the last max_age_days
+    days. With use_location, both provinces must also be known and equal,
+    so jobs without a location are only matched with use_location=False.
+    Jobs without a title or company are kept, so for sources whose
+    listings lack them this runs on the enriched jobs.
+
+    Args:
+        jobs_df (pandas.DataFrame): Jobs with 'source', 'job_id',
+        'job_title', 'job_company' and optionally 'job_location' columns.
+        use_location (bool): Whether to compare provinces.
+        max_age_days (int): How many days back to look for the same job.
+
+    Returns:
+        pandas.DataFrame: The jobs not posted on another source.
+    """
+    if jobs_df.empty or 'job_title' not in jobs_df or \
+            'job_company' not in jobs_df:
+        return jobs_df
+    locations = jobs_df['job_location'] if 'job_location' in jobs_df \
+        else [None] * len(jobs_df)
+
+    cutoff = (date.today() - timedelta(days=max_age_days)).isoformat()
+
+    conn = _connect()
+    try:
+        keep = []
+        for source, title, company, location in zip(
+                jobs_df['source'], jobs_df['job_title'],
+                jobs_df['job_company'], locations):
+            fingerprint = job_fingerprint(title, company)
+            if fingerprint is None:
+                keep.append(True)
+                continue
+            province = location_bucket(location)
+            if use_location and province is None:
+                keep.append(True)
+                continue
+            match = conn.execute(
+                "SELECT source, job_id FROM job_fingerprints"
+                " WHERE fingerprint = ? AND source != ? AND scraped_on >= ?"
+                " AND (? = 0 OR province = ?)"
+                " LIMIT 1",
+                (fingerprint, source, cutoff, use_location,
+                 province)).fetchone()
+            if match is not None:
+                print(f"Skipping {title} - {company}, already scraped from "
+                      f"{match[0]} (job {match[1]}).")
+            keep.append(match is None)
+    finally:
+        conn.close()
+    return jobs_df[keep]
@@ -0,0 +1,140 @@
+from array import array
+import hashlib
+import mmap
+import os
+import threading
+
+from utils.gsheet_utils import normalize_job_id
+from utils.http_cache import CACHE_DIR
+
+SEEN_KEYS_PATH = os.path.join(CACHE_DIR, 'seen_keys.bin')
+# Keys are 64-bit hashes, so the file costs 8 bytes per scraped job and a
+# false "seen" needs a hash collision (about 1 in 10^9 at 200k jobs).
+KEY_SIZE = 8
+
+_seen_keys = None
+_keys_lock = threading.Lock()
+
+
+def job_key(source, job_id):
+    """Returns the 64-bit key of a (source, job_id) pair."""
+    digest = hashlib.blake2b(
+        f"{source}\x1f{normalize_job_id(job_id)}".encode('utf-8'),
+        digest_size=KEY_SIZE).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _read_keys():
+    try:
+        with open(SEEN_KEYS_PATH, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # A run killed mid-append can leave a partial key at the end.
+            size -= size % KEY_SIZE
+            if size == 0:
+                return set()
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    return set(view.cast('Q'))
+                finally:
+                    view.release()
+    except FileNotFoundError:
+        return set()
+
+
+def has_seen_keys():
+    """Returns True if the key file exists."""
+    return os.path.exists(SEEN_KEYS_PATH)
+
+
+def load_seen_keys():
+    """
+    Loads the key file into memory, once per process.
+
+    Returns:
+        set: The keys of every job seen so far, as returned by job_key.
+    """
+    global _seen_keys
+    with _keys_lock:
+        if _seen_keys is None:
+            _seen_keys = _read_keys()
+        return _seen_keys
+
+
+def add_seen_keys(jobs):
+    """
+    Appends the keys of jobs that are not in the key file yet.
+
+    Args:
+        jobs (iterable): (source, job_id) pairs.
+
+    Returns:
+        int: The number of keys appended.
+    """
+    seen = load_seen_keys()
+    with _keys_lock:
+        new_keys = array('Q')
+        for source, job_id in jobs:
+            key = job_key(source, job_id)
+            if key not in seen:
+                seen.add(key)
+                new_keys.append(key)
+        if new_keys:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(SEEN_KEYS_PATH, 'ab') as f:
+                size = f.tell()
+                if size % KEY_SIZE:
+                    f.truncate(size - size % KEY_SIZE)
+                new_keys.tofile(f)
+    return len(new_keys)
+
+
+def rewrite_seen_keys(jobs):
+    """
+    Replaces the key file with the keys of the given jobs.
+
+    Args:
+        jobs (iterable): (source, job_id) pairs.
+    """
+    global _seen_keys
+    keys = {job_key(source, job_id) for source, job_id in jobs}
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{SEEN_KEYS_PATH}.tmp"
+    with open(tmp_path, 'wb') as f:
+        array('Q', keys).tofile(f)
+    os.replace(tmp_path, SEEN_KEYS_PATH)
+    with _keys_lock:
+        _seen_keys = keys
+
+
+def filter_unseen(jobs_df):
+    """
+    Drops the jobs whose (source, job_id) is in the key file.
+
+    Args:
+        jobs_df (pandas.DataFrame): Jobs with 'source' and 'job_id'
+        columns.
+
+    Returns:
+        pandas.DataFrame: The jobs not seen before.
+    """
+    if jobs_df.empty:
+        return jobs_df
+    seen = load_seen_keys()
+    unseen = [job_key(source, job_id) not in seen for source, job_id
+              in zip(jobs_df['source'], jobs_df['job_id'])]
+    return jobs_df[unseen]
+
+
+def mark_seen(jobs_df):
+    """
+    Appends the keys of exported jobs to the key file.
+
+    Args:
+        jobs_df (pandas.DataFrame): Jobs with 'source' and 'job_id'
+        columns.
+
+    Returns:
+        int: The number of keys appended.
+    """
+    return add_seen_keys(zip(jobs_df['source'], jobs_df['job_id']))